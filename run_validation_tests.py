@@ -12,9 +12,11 @@ from pathlib import Path
 # Add tests directory to path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from tests.test_validation_suite import ValidationTracker, TestValidationSuite
+from tests.test_validation_suite import ValidationTracker, tracker
 import pytest
 
+RESULTS_JSONL = "validation_results.jsonl"
+
 
 def generate_report(tracker: ValidationTracker, output_file: str = "validation_report.json"):
     """Generate validation report."""
@@ -22,7 +24,8 @@ def generate_report(tracker: ValidationTracker, output_file: str = "validation_r
     
     # Add timestamp
     summary["timestamp"] = datetime.now().isoformat()
-    summary["total_time_seconds"] = sum(r.get("duration", 0) for r in summary["results"])
+    # elapsed_ns is each result's offset from tracker start, so the latest one spans the run
+    summary["total_time_seconds"] = max((r["elapsed_ns"] for r in summary["results"]), default=0) / 1e9
     
     # Save to file
     with open(output_file, 'w') as f:
@@ -49,6 +52,8 @@ def generate_report(tracker: ValidationTracker, output_file: str = "validation_r
     
     print("\n" + "="*80)
     print(f"Full report saved to: {output_file}")
+    if tracker.results_path:
+        print(f"Per-test details streamed to: {tracker.results_path}")
     print("="*80 + "\n")
     
     return summary
@@ -62,18 +67,19 @@ def main():
     print("Start with: uvicorn sales_agent.api.main:app --reload")
     print("="*80 + "\n")
     
+    # Stream full per-test payloads to disk as they are recorded
+    tracker.stream_to(RESULTS_JSONL)
+    
     # Run pytest with our test suite
     # Use pytest's async support
     exit_code = pytest.main([
         "-v",
         "-s",
         "--tb=short",
+        "--durations=20",
         "tests/test_validation_suite.py"
     ])
     
-    # Import tracker after tests run
-    from tests.test_validation_suite import tracker
-    
     # Generate report
     report = generate_report(tracker)
     
@@ -1,4 +1,5 @@
 from fastapi import FastAPI, HTTPException, Request
+from fastapi.middleware.gzip import GZipMiddleware
 from pydantic import BaseModel
 from typing import Optional, Dict, Any
 import os
@@ -10,11 +11,15 @@ from dotenv import load_dotenv
 # Load environment variables from .env file
 load_dotenv()
 
+# Make the sales_agent package importable when launched from sales_agent/ (uvicorn api.main:app)
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, _PROJECT_ROOT)
+
+from sales_agent.config.settings import config
+from sales_agent.engine.orchestrator import SalesAgentOrchestrator
+
 def configure_logging() -> None:
-    # Add parent directory to path for config import
-    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-    from config.settings import config
-    
     level_name = config.LOG_LEVEL.upper()
     level = getattr(logging, level_name, logging.INFO)
     logging.basicConfig(
@@ -28,11 +33,9 @@ def configure_logging() -> None:
 configure_logging()
 logger = logging.getLogger(__name__)
 
-# Add parent directory to path to import engine modules
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from engine.orchestrator import SalesAgentOrchestrator
-
 app = FastAPI(title="Sales Agent API")
+# Chat responses carry several KB of dashboard JSON; clients (httpx) send Accept-Encoding: gzip by default
+app.add_middleware(GZipMiddleware, minimum_size=1000)
 orchestrator = SalesAgentOrchestrator()
 
 @app.middleware("http")
@@ -135,9 +138,6 @@ async def health():
     
     # Check LLM connection
     try:
-        # Add parent directory to path for config import
-        sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-        from config.settings import config
         api_key = config.ANTHROPIC_API_KEY
         if api_key:
             # Quick connection test
@@ -0,0 +1,5 @@
+"""
+Sales Agent Configuration Package
+
+Holds runtime settings and the JSON knowledge base consumed by the engine.
+"""
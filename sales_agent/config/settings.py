@@ -27,12 +27,20 @@ class Config:
     RETRY_MAX_ATTEMPTS: int = int(os.getenv("RETRY_MAX_ATTEMPTS", "3"))
     RETRY_BASE_DELAY_SECONDS: float = float(os.getenv("RETRY_BASE_DELAY_SECONDS", "1.0"))
     RETRY_MAX_DELAY_SECONDS: float = float(os.getenv("RETRY_MAX_DELAY_SECONDS", "10.0"))
+    # Provider Retry-After hints are honoured up to this long, then the call gives up
+    RETRY_MAX_HINT_DELAY_SECONDS: float = float(os.getenv("RETRY_MAX_HINT_DELAY_SECONDS", "60.0"))
     
     # LLM Configuration
     LLM_TIMEOUT_SECONDS: float = float(os.getenv("LLM_TIMEOUT_SECONDS", "30.0"))
     LLM_MAX_TOKENS_CAPTURE: int = int(os.getenv("LLM_MAX_TOKENS_CAPTURE", "500"))
     LLM_MAX_TOKENS_SITUATION: int = int(os.getenv("LLM_MAX_TOKENS_SITUATION", "200"))
     LLM_MAX_TOKENS_RESPONSE: int = int(os.getenv("LLM_MAX_TOKENS_RESPONSE", "150"))
+    # Upper bound on concurrent capture calls in CaptureEngine.extract_many
+    CAPTURE_MAX_CONCURRENCY: int = int(os.getenv("CAPTURE_MAX_CONCURRENCY", "10"))
+    # Hedging sends a second request when the first is slow, to cut tail latency
+    ENABLE_HEDGING: bool = os.getenv("ENABLE_HEDGING", "false").lower() == "true"
+    # Roughly the p95 detection latency; only slower calls pay for a second request
+    HEDGE_DELAY_SECONDS: float = float(os.getenv("HEDGE_DELAY_SECONDS", "2.0"))
     
     # Connection Pool Configuration
     HTTP_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "10"))
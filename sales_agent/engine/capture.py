@@ -1,36 +1,57 @@
-import os
-import sys
-import json
+import asyncio
+import orjson
 import logging
+import re
+import warnings
 from anthropic import AsyncAnthropic, APIError, APIConnectionError, APIStatusError
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 
-# Add parent directory to path for config import
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config.settings import config
+from ..config.settings import config
+from .exact_cache import ExactMatchCache
 from .utils import retry_with_backoff
 
 logger = logging.getLogger(__name__)
 
+# Invariant tail of the capture prompt; the slot-dependent head is built per engine
+_PROMPT_SUFFIX = """Format: {"slots": {"slot": "value"}, "new_quotes": ["quote"]}
+Extract verbatim quotes. Return ONLY valid JSON."""
+
 
 def _safe_parse_json(response_text: Any) -> Dict[str, Any]:
     if response_text is None:
-        raise json.JSONDecodeError("Empty response", "", 0)
+        raise orjson.JSONDecodeError("Empty response", "", 0)
     if not isinstance(response_text, str):
         response_text = str(response_text)
     text = response_text.strip()
     if not text:
-        raise json.JSONDecodeError("Empty response", text, 0)
+        raise orjson.JSONDecodeError("Empty response", text, 0)
     start = text.find("{")
     end = text.rfind("}")
     if start != -1 and end != -1 and end > start:
         candidate = text[start : end + 1]
     else:
         candidate = text
-    return json.loads(candidate)
+    return orjson.loads(candidate)
+
+
+def _copy_extraction(result: Dict[str, Any]) -> Dict[str, Any]:
+    # Cached entries are shared, so neither side may hold the caller's objects
+    return {
+        "slots": dict(result.get("slots", {})),
+        "new_quotes": list(result.get("new_quotes", []))
+    }
+
 
 class CaptureEngine:
-    def __init__(self, capture_schema: Dict, llm_pool=None, llm_router=None):
+    def __init__(
+        self,
+        capture_schema: Dict,
+        llm_pool=None,
+        llm_router=None,
+        max_concurrency: Optional[int] = None,
+        cache: Optional[ExactMatchCache] = None,
+        prescreen: bool = False
+    ):
         self.schema = capture_schema
         # Use router if provided (Phase 3), otherwise use pool or direct client
         self.router = llm_router
@@ -40,10 +61,36 @@ class CaptureEngine:
         elif llm_pool:
             self.client = llm_pool.get_anthropic_client()
         else:
+            # Each direct client owns its own connections; the pool shares one
+            warnings.warn(
+                "CaptureEngine without llm_pool or llm_router builds its own AsyncAnthropic "
+                "client; pass the shared LLMConnectionPool instead",
+                DeprecationWarning,
+                stacklevel=2
+            )
             self.client = AsyncAnthropic(api_key=config.ANTHROPIC_API_KEY)
         self.slots = capture_schema["capture_schema"]["slots"]
         # Pre-compute slot names for compressed prompts
         self.slot_names = list(self.slots.keys())
+        # Only context and message vary per call, so the slot list is rendered once
+        self._prompt_prefix = (
+            "Extract slots from message. Return JSON only.\n"
+            f"Slots: {', '.join(self.slot_names)}\n"
+            "Context: "
+        )
+        # Caps in-flight LLM calls when extract_many fans out
+        self._semaphore = asyncio.Semaphore(max_concurrency or config.CAPTURE_MAX_CONCURRENCY)
+        # Optional cache of successful extractions keyed on (message, existing_context)
+        self.cache = cache
+        # Opt-in: skip the LLM for messages containing no listen_for phrase at all
+        self._prescreen: Optional[re.Pattern] = None
+        if prescreen:
+            phrases = sorted({phrase for slot in self.slots.values() for phrase in slot.get("listen_for", [])})
+            if phrases:
+                self._prescreen = re.compile(
+                    r"\b(?:" + "|".join(re.escape(phrase) for phrase in phrases) + r")\b",
+                    re.IGNORECASE
+                )
     
     async def extract(
         self, 
@@ -52,16 +99,20 @@ class CaptureEngine:
         complexity: Optional[str] = None
     ) -> Dict[str, Any]:
         
+        if self._prescreen is not None and not self._prescreen.search(message):
+            return {
+                "slots": {},
+                "new_quotes": []
+            }
+        
+        if self.cache is not None:
+            cached = self.cache.get(message, self._cache_context(message, existing_context))
+            if cached is not None:
+                return _copy_extraction(cached)
+        
         # Compressed prompt: ~150 tokens vs ~500 tokens original
         context_str = ", ".join([f"{k}:{v}" for k, v in existing_context.items() if v]) or "none"
-        slot_names_str = ", ".join(self.slot_names)
-        
-        prompt = f"""Extract slots from message. Return JSON only.
-Slots: {slot_names_str}
-Context: {context_str}
-Message: "{message}"
-Format: {{"slots": {{"slot": "value"}}, "new_quotes": ["quote"]}}
-Extract verbatim quotes. Return ONLY valid JSON."""
+        prompt = f'{self._prompt_prefix}{context_str}\nMessage: "{message}"\n{_PROMPT_SUFFIX}'
 
         # Use router if available (Phase 3), otherwise fallback to direct client
         if self.router:
@@ -79,19 +130,27 @@ Extract verbatim quotes. Return ONLY valid JSON."""
                     _call_router,
                     max_attempts=config.RETRY_MAX_ATTEMPTS,
                     base_delay=config.RETRY_BASE_DELAY_SECONDS,
-                    exceptions=(Exception,)
+                    exceptions=(Exception,),
+                    jitter=True
                 )
 
                 result = _safe_parse_json(response_text)
 
-                # Filter out null/empty slot values
-                result["slots"] = {k: v for k, v in result.get("slots", {}).items() if v}
+                # Keep non-empty values for schema slots only
+                result["slots"] = self._filter_slots(result.get("slots", {}))
 
-                return {
+                extracted = {
                     "slots": result.get("slots", {}),
                     "new_quotes": result.get("new_quotes", [])
                 }
-            except (json.JSONDecodeError, KeyError, AttributeError) as e:
+                if self.cache is not None:
+                    self.cache.set(
+                        message,
+                        self._cache_context(message, existing_context),
+                        _copy_extraction(extracted)
+                    )
+                return extracted
+            except (orjson.JSONDecodeError, KeyError, AttributeError) as e:
                 preview = None
                 try:
                     if isinstance(response_text, str):
@@ -131,17 +190,24 @@ Extract verbatim quotes. Return ONLY valid JSON."""
                     _call_api,
                     max_attempts=config.RETRY_MAX_ATTEMPTS,
                     base_delay=config.RETRY_BASE_DELAY_SECONDS,
-                    exceptions=(APIError, APIConnectionError, APIStatusError, Exception)
+                    exceptions=(APIError, APIConnectionError, APIStatusError, Exception),
+                    jitter=True
                 )
                 
                 result = _safe_parse_json(response_text)
                 
-                # Filter out nulls
-                result["slots"] = {k: v for k, v in result["slots"].items() if v}
+                # Filter out nulls and slots outside the schema
+                result["slots"] = self._filter_slots(result["slots"])
                 
+                if self.cache is not None:
+                    self.cache.set(
+                        message,
+                        self._cache_context(message, existing_context),
+                        _copy_extraction(result)
+                    )
                 return result
                 
-            except (json.JSONDecodeError, KeyError, AttributeError) as e:
+            except (orjson.JSONDecodeError, KeyError, AttributeError) as e:
                 preview = None
                 try:
                     if isinstance(response_text, str):
@@ -167,11 +233,27 @@ Extract verbatim quotes. Return ONLY valid JSON."""
                     "new_quotes": []
                 }
     
-    def _format_slots(self) -> str:
-        formatted = []
-        for name, config in self.slots.items():
-            formatted.append(f"- {name}: {config['description']}")
-            listen_for_list = config['listen_for'][:5] if len(config['listen_for']) > 5 else config['listen_for']
-            formatted.append(f"  Listen for: {', '.join(listen_for_list)}...")
-        return "\n".join(formatted)
-
+    async def extract_many(
+        self,
+        items: List[Tuple[str, Dict]],
+        complexity: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Extract several (message, existing_context) pairs concurrently, in input order."""
+        async def _extract_one(message: str, existing_context: Dict) -> Dict[str, Any]:
+            async with self._semaphore:
+                return await self.extract(message, existing_context, complexity)
+        
+        # extract() already falls back to an empty result on LLM failure
+        return await asyncio.gather(
+            *(_extract_one(message, existing_context) for message, existing_context in items)
+        )
+    
+    @staticmethod
+    def _cache_context(message: str, existing_context: Dict) -> Dict:
+        # ExactMatchCache casefolds the message, but quotes are verbatim, so the
+        # exact text rides along in the (un-normalized) context part of the key
+        return {**existing_context, "__message__": message}
+    
+    def _filter_slots(self, raw_slots: Dict[str, Any]) -> Dict[str, Any]:
+        # Bounded by the schema size rather than by whatever the LLM returned
+        return {name: value for name in self.slot_names if (value := raw_slots.get(name))}
@@ -2,31 +2,45 @@
 Exact-match in-memory cache for API responses.
 Uses message hash as key to provide fast cache lookups.
 """
-import hashlib
-import json
 import time
 import logging
-from typing import Dict, Any, Optional
+import threading
+import orjson
+import xxhash
+from collections import OrderedDict
+from typing import Callable, Dict, Any, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
 
 class ExactMatchCache:
-    """In-memory exact-match cache with TTL support."""
+    """In-memory exact-match LRU cache with TTL support."""
     
-    def __init__(self, ttl_seconds: int = 3600, max_size: int = 1000):
+    def __init__(
+        self,
+        ttl_seconds: int = 3600,
+        max_size: int = 1000,
+        clock: Callable[[], float] = time.monotonic
+    ):
         """
         Initialize cache with TTL and size limits.
         
         Args:
             ttl_seconds: Time-to-live for cache entries in seconds (default: 1 hour)
             max_size: Maximum number of entries before eviction (default: 1000)
+            clock: Monotonic time source for TTL checks (default: time.monotonic)
         """
-        self.cache: Dict[str, Dict[str, Any]] = {}
+        # Entries are (monotonic timestamp, response) tuples, least recently used first
+        self.cache: OrderedDict[str, Tuple[float, Dict[str, Any]]] = OrderedDict()
         self.ttl_seconds = ttl_seconds
         self.max_size = max_size
+        self._clock = clock
+        # Full sweeps are O(n), so run at most once per TTL window
+        self._last_sweep = clock()
         self._hits = 0
         self._misses = 0
+        # Guards the store and counters; hashing happens outside it
+        self._lock = threading.Lock()
     
     def _make_key(self, message: str, context: Dict) -> str:
         """
@@ -37,15 +51,16 @@ class ExactMatchCache:
             context: Existing context dictionary
             
         Returns:
-            SHA256 hash string as cache key
+            xxh3-64 hex digest as cache key (in-process only, so no need for SHA256)
         """
-        # Create deterministic key from message + context
+        # Create deterministic key from message + context (OPT_SORT_KEYS orders it);
+        # casefolding and collapsing whitespace runs lets case/spacing variants share a key
         key_data = {
-            "message": message.lower().strip(),
-            "context": {k: v for k, v in sorted(context.items()) if v}
+            "message": " ".join(message.casefold().split()),
+            "context": {k: v for k, v in context.items() if v}
         }
-        key_json = json.dumps(key_data, sort_keys=True)
-        return hashlib.sha256(key_json.encode()).hexdigest()
+        key_json = orjson.dumps(key_data, option=orjson.OPT_SORT_KEYS)
+        return xxhash.xxh3_64_hexdigest(key_json)
     
     def get(self, message: str, context: Dict) -> Optional[Dict[str, Any]]:
         """
@@ -60,20 +75,23 @@ class ExactMatchCache:
         """
         cache_key = self._make_key(message, context)
         
-        if cache_key not in self.cache:
-            self._misses += 1
-            return None
-        
-        entry = self.cache[cache_key]
-        
-        # Check if expired
-        if time.time() - entry["timestamp"] > self.ttl_seconds:
-            del self.cache[cache_key]
-            self._misses += 1
-            return None
-        
-        self._hits += 1
-        return entry["response"]
+        with self._lock:
+            entry = self.cache.get(cache_key)
+            if entry is None:
+                self._misses += 1
+                return None
+            
+            timestamp, response = entry
+            
+            # Check if expired
+            if self._clock() - timestamp > self.ttl_seconds:
+                del self.cache[cache_key]
+                self._misses += 1
+                return None
+            
+            self.cache.move_to_end(cache_key)
+            self._hits += 1
+        return response
     
     def set(self, message: str, context: Dict, response: Dict[str, Any]):
         """
@@ -85,26 +103,37 @@ class ExactMatchCache:
             response: Full response structure to cache
         """
         cache_key = self._make_key(message, context)
+        now = self._clock()
         
-        # Evict oldest entry if cache is full (simple FIFO)
-        if len(self.cache) >= self.max_size and cache_key not in self.cache:
-            # Remove oldest entry
-            oldest_key = min(
-                self.cache.keys(),
-                key=lambda k: self.cache[k]["timestamp"]
-            )
-            del self.cache[oldest_key]
-        
-        self.cache[cache_key] = {
-            "response": response,
-            "timestamp": time.time()
-        }
+        with self._lock:
+            if cache_key in self.cache:
+                self.cache.move_to_end(cache_key)
+            elif len(self.cache) >= self.max_size:
+                # Reclaim expired entries if a TTL has passed since the last sweep;
+                # otherwise (or if none expired) evict the least recently used
+                if now - self._last_sweep >= self.ttl_seconds:
+                    self._sweep_expired(now)
+                if len(self.cache) >= self.max_size:
+                    self.cache.popitem(last=False)
+            
+            self.cache[cache_key] = (now, response)
+    
+    def _sweep_expired(self, now: float):
+        """Drop every expired entry in one pass. Caller must hold the lock."""
+        expired = [
+            key for key, (timestamp, _) in self.cache.items()
+            if now - timestamp > self.ttl_seconds
+        ]
+        for key in expired:
+            del self.cache[key]
+        self._last_sweep = now
     
     def clear(self):
         """Clear all cache entries."""
-        self.cache.clear()
-        self._hits = 0
-        self._misses = 0
+        with self._lock:
+            self.cache.clear()
+            self._hits = 0
+            self._misses = 0
     
     def get_stats(self) -> Dict[str, Any]:
         """
@@ -113,14 +142,16 @@ class ExactMatchCache:
         Returns:
             Dictionary with hit rate, size, and counts
         """
-        total = self._hits + self._misses
-        hit_rate = self._hits / total if total > 0 else 0.0
+        with self._lock:
+            hits, misses, size = self._hits, self._misses, len(self.cache)
+        total = hits + misses
+        hit_rate = hits / total if total > 0 else 0.0
         
         return {
-            "hits": self._hits,
-            "misses": self._misses,
+            "hits": hits,
+            "misses": misses,
             "hit_rate": hit_rate,
-            "size": len(self.cache),
+            "size": size,
             "max_size": self.max_size,
             "ttl_seconds": self.ttl_seconds
         }
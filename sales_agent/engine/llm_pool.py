@@ -2,17 +2,13 @@
 LLM Connection Pool for shared HTTP connections and client reuse.
 Implements HTTP/2 connection pooling to reduce cold start latency.
 """
-import os
-import sys
 import asyncio
 import httpx
 import logging
 from anthropic import AsyncAnthropic
 from typing import Optional
 
-# Add parent directory to path for config import
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config.settings import config
+from ..config.settings import config
 
 logger = logging.getLogger(__name__)
 
@@ -2,17 +2,13 @@
 LLM Router with multi-provider racing support.
 Races multiple LLM providers and returns the first completed response.
 """
-import os
-import sys
 import asyncio
 import logging
 from typing import Dict, Any, Optional, List, Tuple
 from anthropic import AsyncAnthropic, APIError, APIConnectionError, APIStatusError
 from openai import AsyncOpenAI
 
-# Add parent directory to path for config import
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config.settings import config
+from ..config.settings import config
 
 logger = logging.getLogger(__name__)
 
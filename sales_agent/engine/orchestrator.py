@@ -1,14 +1,11 @@
 import json
 import os
-import sys
 import time
 import logging
 import asyncio
 from typing import Dict, Any, List
 
-# Add parent directory to path for config import
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config.settings import config
+from ..config.settings import config
 from .capture import CaptureEngine
 from .situation_detector import SituationDetector
 from .principle_selector import PrincipleSelector
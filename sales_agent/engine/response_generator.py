@@ -1,13 +1,9 @@
-import os
-import sys
 import re
 import logging
 from anthropic import AsyncAnthropic, APIError, APIConnectionError, APIStatusError
 from typing import Dict, Any, List, Optional
 
-# Add parent directory to path for config import
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config.settings import config
+from ..config.settings import config
 from .utils import retry_with_backoff
 
 logger = logging.getLogger(__name__)
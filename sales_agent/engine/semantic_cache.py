@@ -2,8 +2,6 @@
 Semantic Cache using embeddings for similarity-based caching.
 Finds semantically similar messages and returns cached responses.
 """
-import os
-import sys
 import json
 import time
 import logging
@@ -12,9 +10,7 @@ import numpy as np
 from typing import Dict, Any, Optional, List, Tuple
 from openai import AsyncOpenAI
 
-# Add parent directory to path for config import
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config.settings import config
+from ..config.settings import config
 
 logger = logging.getLogger(__name__)
 
@@ -1,17 +1,48 @@
-import os
-import sys
+import re
 import json
+import asyncio
 import logging
+import weakref
 from anthropic import AsyncAnthropic, APIError, APIConnectionError, APIStatusError
-from typing import Dict, Any, Optional
+from typing import Awaitable, Callable, Dict, Any, Optional, Set
 
-# Add parent directory to path for config import
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config.settings import config
-from .utils import retry_with_backoff
+from ..config.settings import config
+from .utils import retry_with_backoff, retry_after_hint
 
 logger = logging.getLogger(__name__)
 
+# Clients shared by detectors built without a pool/router, one per event loop since
+# the underlying httpx transport is bound to the loop that first uses it
+_shared_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncAnthropic]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _new_client() -> AsyncAnthropic:
+    # Retries are handled by retry_with_backoff, so disable the SDK's own
+    return AsyncAnthropic(api_key=config.ANTHROPIC_API_KEY, max_retries=0)
+
+
+def _get_shared_client() -> AsyncAnthropic:
+    """Return the running loop's shared Anthropic client, creating it on first use."""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # Built outside a loop: nothing to scope a shared client to
+        return _new_client()
+    client = _shared_clients.get(loop)
+    if client is None:
+        client = _shared_clients[loop] = _new_client()
+    return client
+
+
+def reset_shared_clients():
+    """Drop every shared client so the next detector builds a fresh one."""
+    _shared_clients.clear()
+
+# Detection output is a flat object, so the first brace-free {...} block is the payload
+_JSON_OBJECT_RE = re.compile(r"\{[^{}]*\}")
+
 
 def _safe_parse_json(response_text: Any) -> Dict[str, Any]:
     if response_text is None:
@@ -21,16 +52,62 @@ def _safe_parse_json(response_text: Any) -> Dict[str, Any]:
     text = response_text.strip()
     if not text:
         raise json.JSONDecodeError("Empty response", text, 0)
+    if text[0] == "{":
+        # Fast path: well-behaved model output is already a bare object
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            pass
     start = text.find("{")
     end = text.rfind("}")
     if start != -1 and end != -1 and end > start:
         candidate = text[start : end + 1]
     else:
         candidate = text
-    return json.loads(candidate)
+    try:
+        return json.loads(candidate)
+    except json.JSONDecodeError:
+        # Prose around or after the object (e.g. trailing "{...}" examples)
+        match = _JSON_OBJECT_RE.search(text)
+        if match is None:
+            raise
+        return json.loads(match.group(0))
+
+class _JsonObjectScanner:
+    """Tracks streamed text until the first top-level JSON object closes."""
+    
+    def __init__(self):
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+    
+    def feed(self, text: str) -> bool:
+        """Consume a chunk; return True once the object has closed."""
+        for ch in text:
+            if self.depth == 0:
+                # Prose before the object, braces and quotes included, is ignored
+                if ch == "{":
+                    self.depth = 1
+            elif self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == "\\":
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                self.in_string = True
+            elif ch == "{":
+                self.depth += 1
+            elif ch == "}":
+                self.depth -= 1
+                if self.depth == 0:
+                    return True
+        return False
+
 
 class SituationDetector:
-    def __init__(self, situations: Dict, llm_pool=None, llm_router=None):
+    def __init__(self, situations: Dict[str, Dict[str, Any]], llm_pool=None, llm_router=None):
         self.situations = situations
         # Use router if provided (Phase 3), otherwise use pool or direct client
         self.router = llm_router
@@ -40,70 +117,84 @@ class SituationDetector:
         elif llm_pool:
             self.client = llm_pool.get_anthropic_client()
         else:
-            self.client = AsyncAnthropic(api_key=config.ANTHROPIC_API_KEY)
+            self.client = _get_shared_client()
         # Default fallback situation
         self.default_situation = config.DEFAULT_SITUATION
         # Pre-compute situation keys for compressed prompts
-        self.situation_keys = list(self.situations.keys())
+        self.situation_keys = tuple(self.situations)
+        # Static prompt sections are built once; only context and message vary per call
+        self._prompt_prefix = (
+            "Detect situation from message. Return JSON only.\n"
+            f"Situations: {', '.join(self.situation_keys)}\n"
+        )
+        self._prompt_suffix = (
+            '\nFormat: {"situation": "key", "confidence": 0.0-1.0, '
+            '"stage": "discovery|qualification|presentation|objection_handling|closing"}\n'
+            "Return ONLY valid JSON."
+        )
     
     async def detect(
         self, 
         message: str, 
-        context: Dict,
+        context: Dict[str, Any],
         complexity: Optional[str] = None
     ) -> Dict[str, Any]:
         
         # Compressed prompt: ~150 tokens vs ~400 tokens original
         context_str = ", ".join([f"{k}:{v}" for k, v in context.items() if v]) or "none"
-        situations_str = ", ".join(self.situation_keys)
         
-        prompt = f"""Detect situation from message. Return JSON only.
-Situations: {situations_str}
-Context: {context_str}
-Message: "{message}"
-Format: {{"situation": "key", "confidence": 0.0-1.0, "stage": "discovery|qualification|presentation|objection_handling|closing"}}
-Return ONLY valid JSON."""
+        prompt = f'{self._prompt_prefix}Context: {context_str}\nMessage: "{message}"{self._prompt_suffix}'
+
+        response_text: Any = None
 
         # Use router if available (Phase 3), otherwise fallback to direct client
         try:
             if self.router:
-                async def _call_router():
+                async def _call_router() -> str:
                     response_text, winning_provider = await self.router.call(
                         prompt=prompt,
                         max_tokens=config.LLM_MAX_TOKENS_SITUATION,
                         complexity=complexity or "medium"  # Pass complexity for tiered selection
                     )
-                    logger.debug(f"Situation detection: {winning_provider} won the race (complexity: {complexity})")
+                    logger.debug(
+                        "Situation detection: %s won the race (complexity: %s)",
+                        winning_provider,
+                        complexity
+                    )
                     return response_text
 
                 response_text = await retry_with_backoff(
                     _call_router,
                     max_attempts=config.RETRY_MAX_ATTEMPTS,
                     base_delay=config.RETRY_BASE_DELAY_SECONDS,
-                    exceptions=(Exception,)
+                    exceptions=(Exception,),
+                    delay_hint=retry_after_hint,
+                    attempt_timeout=config.LLM_TIMEOUT_SECONDS
                 )
             else:
                 # Fallback to direct client (Phase 1/2 behavior)
-                async def _call_api():
-                    response = await self.client.messages.create(
-                        model=config.ANTHROPIC_MODEL,
-                        max_tokens=config.LLM_MAX_TOKENS_SITUATION,
-                        messages=[{"role": "user", "content": prompt}]
-                    )
-                    return response.content[0].text
+                async def _create() -> str:
+                    return await self._stream_json_object(prompt)
+
+                async def _call_api() -> str:
+                    if config.ENABLE_HEDGING:
+                        return await self._hedged_call(_create)
+                    return await _create()
 
                 response_text = await retry_with_backoff(
                     _call_api,
                     max_attempts=config.RETRY_MAX_ATTEMPTS,
                     base_delay=config.RETRY_BASE_DELAY_SECONDS,
-                    exceptions=(APIError, APIConnectionError, APIStatusError, Exception)
+                    exceptions=(APIError, APIConnectionError, APIStatusError, Exception),
+                    delay_hint=retry_after_hint,
+                    attempt_timeout=config.LLM_TIMEOUT_SECONDS
                 )
 
             result = _safe_parse_json(response_text)
 
             # Validate situation exists
             if result.get("situation") not in self.situations:
-                logger.warning(f"Unknown situation detected: {result.get('situation')}. Using default.")
+                logger.warning("Unknown situation detected: %s. Using default.", result.get("situation"))
                 result["situation"] = self.default_situation
                 result["confidence"] = config.DEFAULT_CONFIDENCE
 
@@ -119,8 +210,9 @@ Return ONLY valid JSON."""
             except Exception:
                 preview = "<unavailable>"
             logger.error(
-                f"Failed to parse situation detection response: {str(e)}; "
-                f"preview={preview}"
+                "Failed to parse situation detection response: %s; preview=%s",
+                e,
+                preview
             )
             # Return default fallback
             return {
@@ -129,7 +221,7 @@ Return ONLY valid JSON."""
                 "stage": config.DEFAULT_STAGE
             }
         except Exception as e:
-            logger.error(f"Unexpected error in situation detection: {str(e)}")
+            logger.error("Unexpected error in situation detection: %s", e)
             # Return default fallback
             return {
                 "situation": self.default_situation,
@@ -137,10 +229,79 @@ Return ONLY valid JSON."""
                 "stage": config.DEFAULT_STAGE
             }
     
-    def _format_situations(self) -> str:
-        formatted = []
-        for key, config in self.situations.items():
-            signals = ", ".join(config.get("signals", [])[:3])
-            formatted.append(f"- {key}: signals=[{signals}]")
-        return "\n".join(formatted)
-
+    async def _stream_json_object(self, prompt: str) -> str:
+        """
+        Stream a completion and stop as soon as the top-level JSON object closes.
+        
+        Latency is bounded by the closing brace rather than the last token,
+        which matters when the model appends prose after the JSON.
+        
+        Args:
+            prompt: Detection prompt
+        
+        Returns:
+            Text received up to and including the closing brace
+        """
+        chunks = []
+        scanner = _JsonObjectScanner()
+        async with self.client.messages.stream(
+            model=config.ANTHROPIC_MODEL,
+            max_tokens=config.LLM_MAX_TOKENS_SITUATION,
+            messages=[{"role": "user", "content": prompt}]
+        ) as stream:
+            async for text in stream.text_stream:
+                chunks.append(text)
+                if scanner.feed(text):
+                    # Leaving the context manager closes the underlying stream
+                    break
+        return "".join(chunks)
+    
+    async def _hedged_call(
+        self,
+        func: Callable[[], Awaitable[Any]],
+        copies: int = 2,
+        delay: Optional[float] = None
+    ) -> Any:
+        """
+        Issue a request and hedge with another copy if it is slow or fails.
+        
+        A further copy starts only once the outstanding ones have run past
+        ``delay`` (or all failed), so the common fast path costs one request;
+        losing requests are cancelled as soon as a winner completes.
+        
+        Args:
+            func: Async callable performing a single request
+            copies: Maximum number of requests to issue
+            delay: Seconds to wait before hedging (default: HEDGE_DELAY_SECONDS)
+        
+        Returns:
+            Result of the first request that completes successfully
+        
+        Raises:
+            Last exception if every request fails
+        """
+        delay = config.HEDGE_DELAY_SECONDS if delay is None else delay
+        pending: Set[asyncio.Task] = {asyncio.create_task(func())}
+        launched = 1
+        last_exception: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=delay if launched < copies else None,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.cancelled():
+                        continue
+                    if task.exception() is None:
+                        return task.result()
+                    last_exception = task.exception()
+                # Hedge when the outstanding request is past the delay or has failed
+                if launched < copies and (not done or not pending):
+                    pending.add(asyncio.create_task(func()))
+                    launched += 1
+            raise last_exception if last_exception is not None else asyncio.CancelledError()
+        finally:
+            for task in pending:
+                task.cancel()
@@ -1,16 +1,12 @@
 """
 Utility functions for retry logic and error handling
 """
-import os
-import sys
 import asyncio
 import logging
-from typing import Callable, Any, Optional, TypeVar
-from functools import wraps
+import random
+from typing import Awaitable, Callable, Any, Optional, Tuple, Type, TypeVar
 
-# Add parent directory to path for config import
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config.settings import config
+from ..config.settings import config
 
 logger = logging.getLogger(__name__)
 
@@ -18,12 +14,16 @@ T = TypeVar('T')
 
 
 async def retry_with_backoff(
-    func: Callable[[], Any],
+    func: Callable[[], Awaitable[T]],
     max_attempts: Optional[int] = None,
     base_delay: Optional[float] = None,
     max_delay: Optional[float] = None,
-    exceptions: tuple = (Exception,)
-) -> Any:
+    exceptions: Tuple[Type[BaseException], ...] = (Exception,),
+    delay_hint: Optional[Callable[[Exception], Optional[float]]] = None,
+    attempt_timeout: Optional[float] = None,
+    jitter: bool = False,
+    max_hint_delay: Optional[float] = None
+) -> T:
     """
     Retry a function with exponential backoff.
     
@@ -33,6 +33,15 @@ async def retry_with_backoff(
         base_delay: Base delay in seconds (default: from config)
         max_delay: Maximum delay in seconds (default: from config)
         exceptions: Tuple of exceptions to catch and retry on
+        delay_hint: Optional callable returning a provider-suggested delay
+            (e.g. Retry-After) for a failed attempt; the larger of the hint
+            and the backoff delay is used, even beyond max_delay
+        attempt_timeout: Optional timeout in seconds for each individual
+            attempt (default: none); a timed-out attempt is always retried
+        jitter: Use full jitter, sleeping a uniform random time up to the
+            backoff delay, so concurrent callers don't retry in lockstep
+        max_hint_delay: Longest hinted delay worth waiting for (default: from
+            config); a longer hint raises immediately instead of retrying
     
     Returns:
         Result of the function call
@@ -44,23 +53,76 @@ async def retry_with_backoff(
     max_attempts = max_attempts or config.RETRY_MAX_ATTEMPTS
     base_delay = base_delay or config.RETRY_BASE_DELAY_SECONDS
     max_delay = max_delay or config.RETRY_MAX_DELAY_SECONDS
+    max_hint_delay = max_hint_delay or config.RETRY_MAX_HINT_DELAY_SECONDS
+    if attempt_timeout is not None:
+        # A stalled attempt is retried whatever exceptions the caller listed
+        exceptions = exceptions + (asyncio.TimeoutError,)
     
-    last_exception = None
+    last_exception: Optional[BaseException] = None
     
     for attempt in range(max_attempts):
         try:
-            return await func()
+            if attempt_timeout is None:
+                return await func()
+            # Bound each attempt so a stalled connection can't eat the whole retry budget
+            return await asyncio.wait_for(func(), timeout=attempt_timeout)
         except exceptions as e:
             last_exception = e
             if attempt < max_attempts - 1:
                 delay = min(base_delay * (2 ** attempt), max_delay)
+                if jitter:
+                    delay = random.uniform(0, delay)
+                if delay_hint:
+                    hint = delay_hint(e)
+                    if hint:
+                        if hint > max_hint_delay:
+                            # Retrying sooner would only hit the same rate limit again
+                            logger.error(
+                                "Attempt %d/%d failed: %s. Retry-After %.2fs exceeds %.2fs; giving up",
+                                attempt + 1,
+                                max_attempts,
+                                e,
+                                hint,
+                                max_hint_delay
+                            )
+                            raise
+                        delay = max(hint, delay)
                 logger.warning(
-                    f"Attempt {attempt + 1}/{max_attempts} failed: {str(e)}. "
-                    f"Retrying in {delay:.2f}s..."
+                    "Attempt %d/%d failed: %s. Retrying in %.2fs...",
+                    attempt + 1,
+                    max_attempts,
+                    e,
+                    delay
                 )
                 await asyncio.sleep(delay)
             else:
-                logger.error(f"All {max_attempts} attempts failed. Last error: {str(e)}")
+                logger.error("All %d attempts failed. Last error: %s", max_attempts, e)
     
     raise last_exception
 
+
+def retry_after_hint(exc: Exception) -> Optional[float]:
+    """
+    Extract the Retry-After delay (in seconds) from an API status error.
+    
+    Works with any exception exposing an httpx-style ``response`` attribute,
+    which covers both Anthropic and OpenAI ``APIStatusError`` subclasses.
+    
+    Args:
+        exc: Exception raised by a failed attempt
+    
+    Returns:
+        Delay in seconds if the header is present and numeric, None otherwise
+    """
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        # HTTP-date form is not worth parsing for sub-minute rate limits
+        return None
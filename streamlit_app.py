@@ -4,11 +4,14 @@ Developer-facing interface for analyzing sales conversations with psychology-bac
 """
 import streamlit as st
 import httpx
-import json
+import orjson
 from typing import Dict, Any, Optional
 from datetime import datetime
 import os
+import io
+import re
 import html
+import functools
 from dotenv import load_dotenv
 
 # Page config
@@ -20,7 +23,7 @@ st.set_page_config(
 )
 
 # Custom CSS
-st.markdown("""
+_CSS = """
 <style>
 :root {
     --bg-primary: #0a0a0f;
@@ -104,6 +107,19 @@ h1, h2, h3 {
     letter-spacing: 0.6px;
 }
 
+/* Small uppercase section labels */
+.eyebrow {
+    font-size: 0.75rem;
+    color: var(--text-muted);
+    text-transform: uppercase;
+    margin-bottom: 0.5rem;
+}
+
+.eyebrow-accent {
+    margin-bottom: 0.75rem;
+    font-weight: 600;
+}
+
 .summary-value {
     font-size: 0.95rem;
     font-weight: 600;
@@ -470,41 +486,114 @@ h1, h2, h3 {
     border-color: var(--border-focus);
 }
 
-/* JSON viewer */
-.json-viewer {
-    background: var(--bg-tertiary);
-    border: 1px solid var(--border-color);
-    border-radius: 8px;
-    padding: 1rem;
-    font-family: 'Courier New', monospace;
-    font-size: 0.75rem;
-    overflow-x: auto;
-    max-height: 400px;
-    overflow-y: auto;
-}
-
 /* Hide Streamlit default elements */
 #MainMenu {visibility: hidden;}
 footer {visibility: hidden;}
 header {visibility: hidden;}
 </style>
-""", unsafe_allow_html=True)
+"""
+# Strip comments and layout whitespace: the stylesheet is re-sent on every rerun
+_CSS = re.sub(r"\s*\n\s*", "", re.sub(r"/\*.*?\*/", "", _CSS, flags=re.DOTALL))
 load_dotenv()
 
-API_BASE_URL = os.getenv("API_BASE_URL")
+API_BASE_URL = (os.getenv("API_BASE_URL") or "http://localhost:8000").rstrip("/")
+if not API_BASE_URL.startswith(("http://", "https://")):
+    st.error(f"❌ API_BASE_URL must be an http(s) URL, got: {API_BASE_URL!r}")
+    st.stop()
 DEFAULT_SESSION_ID = "streamlit-demo-session"
 
+_STAGES = ("discovery", "qualification", "presentation", "objection_handling", "closing")
+_STAGE_LABELS = {
+    "discovery": "Discovery",
+    "qualification": "Qualification",
+    "presentation": "Presentation",
+    "objection_handling": "Objection Handling",
+    "closing": "Closing"
+}
+_QUALIFICATION_LABELS = {
+    "need_identified": "Need Identified",
+    "pain_expressed": "Pain Expressed",
+    "product_interest": "Product Interest",
+    "budget_discussed": "Budget Discussed",
+    "timeline_known": "Timeline Known",
+    "decision_maker_known": "Decision Maker Known"
+}
+_DASHBOARD_SECTIONS = (
+    "detection",
+    "qualification_checklist",
+    "captured_context",
+    "recommendation",
+    "fallback",
+    "next_probe",
+    "system"
+)
+
 # Initialize session state
-if "session_id" not in st.session_state:
-    st.session_state.session_id = DEFAULT_SESSION_ID
-if "conversation_history" not in st.session_state:
-    st.session_state.conversation_history = []
-if "last_response" not in st.session_state:
-    st.session_state.last_response = None
-if "show_json" not in st.session_state:
-    st.session_state.show_json = False
-if "show_trace" not in st.session_state:
-    st.session_state.show_trace = True
+for _key, _default in (
+    ("session_id", DEFAULT_SESSION_ID),
+    ("conversation_history", []),
+    ("last_response", None),
+    ("show_json", False),
+    ("show_trace", True),
+):
+    st.session_state.setdefault(_key, _default)
+
+
+@st.cache_resource(show_spinner=False)
+def get_http_client() -> httpx.Client:
+    """Return a long-lived HTTP client so connections survive Streamlit reruns."""
+    # HTTP/2 multiplexes over one connection when the server negotiates it, else falls back to HTTP/1.1
+    return httpx.Client(
+        base_url=API_BASE_URL,
+        http2=True,
+        timeout=httpx.Timeout(30.0, connect=5.0, write=10.0, pool=5.0),
+        limits=httpx.Limits(
+            max_keepalive_connections=20,
+            max_connections=100,
+            keepalive_expiry=30.0
+        )
+    )
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def api_is_healthy() -> bool:
+    """Probe the API health endpoint, cached so it runs at most once a minute."""
+    try:
+        return get_http_client().get("/health", timeout=5.0).status_code == 200
+    except httpx.HTTPError:
+        return False
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _call_api_cached(
+    session_id: str,
+    message: str,
+    channel: Optional[str],
+    turn: Optional[int],
+    product_context_json: bytes,
+) -> Dict[str, Any]:
+    """
+    POST to /chat, memoized per (session, message, channel, turn, context).
+    
+    Only the decoded dict is returned (and cached) — never the httpx.Response,
+    which st.cache_data cannot pickle. Errors propagate so failures are never
+    cached; product context is passed pre-serialized to keep the key hashable.
+    """
+    body = orjson.dumps({
+        "session_id": session_id,
+        "message": message,
+        "product_context": orjson.loads(product_context_json),
+        "channel": channel,
+        "turn": turn,
+    })
+    response = get_http_client().post(
+        "/chat",
+        content=body,
+        headers={"Content-Type": "application/json"},
+        timeout=30.0
+    )
+    response.raise_for_status()
+    return orjson.loads(response.content)
 
 
 def call_api(
@@ -516,31 +605,13 @@ def call_api(
 ) -> Optional[Dict[str, Any]]:
     """Call the FastAPI backend to analyze the message."""
     try:
-        with httpx.Client(timeout=30.0) as client:
-            # First check if API is available
-            health_check_failed = False
-            try:
-                health_response = client.get(f"{API_BASE_URL}/health", timeout=5.0)
-                if health_response.status_code != 200:
-                    st.warning(f"API health check failed. Status: {health_response.status_code}")
-            except Exception:
-                health_check_failed = True
-
-            response = client.post(
-                f"{API_BASE_URL}/chat",
-                json={
-                    "session_id": session_id,
-                    "message": message,
-                    "product_context": product_context,
-                    "channel": channel,
-                    "turn": turn,
-                },
-                timeout=30.0
-            )
-            response.raise_for_status()
-            if health_check_failed:
-                st.warning(f"API health check failed at {API_BASE_URL}, but /chat responded successfully.")
-            return response.json()
+        return _call_api_cached(
+            session_id,
+            message,
+            channel,
+            turn,
+            orjson.dumps(product_context, option=orjson.OPT_SORT_KEYS)
+        )
     except httpx.ConnectError:
         st.error(f"❌ Cannot connect to API at {API_BASE_URL}. Please ensure the FastAPI server is running.")
         st.info("Start the server with: `uvicorn sales_agent.api.main:app --reload`")
@@ -556,140 +627,205 @@ def call_api(
         return None
 
 
+@functools.lru_cache(maxsize=32)
+def parse_prior_context(text: str) -> Dict[str, Any]:
+    """Parse the prior-context JSON textarea, memoized on the raw text across reruns."""
+    # /chat only accepts an object here; reject anything else before parsing it
+    start = len(text) - len(text.lstrip())
+    if text[start:start + 1] != "{":
+        raise orjson.JSONDecodeError("Expected a JSON object", text, start)
+    # Decode errors propagate and are therefore never cached
+    return orjson.loads(text)
+
+
+@functools.lru_cache(maxsize=256)
+def _humanize_str(value: str) -> str:
+    return value.replace("_", " ").title()
+
+
+def humanize(value: Any) -> str:
+    """Turn a snake_case identifier into a display label (e.g. "price_shock" -> "Price Shock")."""
+    return _humanize_str(value if isinstance(value, str) else str(value))
+
+
+@functools.lru_cache(maxsize=1024)
+def _esc_str(value: str) -> str:
+    return html.escape(value)
+
+
 def esc(value: Any) -> str:
     """Escape values for safe HTML rendering."""
     if value is None:
         return ""
-    return html.escape(str(value))
+    return _esc_str(value if isinstance(value, str) else str(value))
+
+
+def format_confidences(detection: Dict[str, Any]) -> Dict[str, str]:
+    """Format situation and persona confidences as percent labels, once per response."""
+    return {
+        "situation": f"{detection.get('situation_confidence', 0.0):.0%}",
+        "persona": f"{detection.get('persona_confidence', 0.0):.0%}"
+    }
+
+
+def _template(markup: str) -> str:
+    """Collapse a multi-line HTML template to one line, once at import."""
+    return re.sub(r"\s*\n\s*", "", markup)
+
+
+_HEADER_HTML = _template("""
+<div style="background: linear-gradient(135deg, #1e1b4b, #312e81); padding: 2rem; border-radius: 12px; margin-bottom: 2rem;">
+    <h1 style="margin: 0; color: #e8e8ed; font-size: 2rem;">🧠 Sales AI Coach</h1>
+    <p style="margin: 0.5rem 0 0 0; color: #9898a8; font-size: 1rem;">Psychology-backed conversation intelligence</p>
+</div>
+""")
 
 
 def render_header():
     """Render the main header."""
-    st.markdown("""
-    <div style="background: linear-gradient(135deg, #1e1b4b, #312e81); padding: 2rem; border-radius: 12px; margin-bottom: 2rem;">
-        <h1 style="margin: 0; color: #e8e8ed; font-size: 2rem;">🧠 Sales AI Coach</h1>
-        <p style="margin: 0.5rem 0 0 0; color: #9898a8; font-size: 1rem;">Psychology-backed conversation intelligence</p>
+    st.markdown(_HEADER_HTML, unsafe_allow_html=True)
+
+
+_WELCOME_HTML = _template("""
+<div class="card" style="text-align: center; padding: 3rem;">
+    <h2 style="color: var(--text-primary); margin-bottom: 1rem;">Welcome to Sales AI Coach</h2>
+    <p style="color: var(--text-secondary); line-height: 1.6;">
+        Enter a customer message in the sidebar and click "Analyze" to get psychology-backed recommendations with full reasoning trace and grounding information.
+    </p>
+</div>
+""")
+
+
+_CUSTOMER_CARD_TPL = _template("""
+<div class="card">
+    <div class="card-header">
+        <span class="card-title">Customer Said</span>
     </div>
-    """, unsafe_allow_html=True)
-
-
-def render_stage_flow(current_stage: str):
-    """Render the stage flow indicator."""
-    stages = ["discovery", "qualification", "presentation", "objection_handling", "closing"]
-    stage_labels = {
-        "discovery": "Discovery",
-        "qualification": "Qualification",
-        "presentation": "Presentation",
-        "objection_handling": "Objection Handling",
-        "closing": "Closing"
-    }
-    
-    stage_html = '<div class="stage-flow">'
+    <div style="font-size: 1rem; color: var(--text-primary); line-height: 1.6;">"{safe_message}"</div>
+    <div style="margin-top: 0.5rem; font-size: 0.75rem; color: var(--text-muted);">
+        Turn #{turn} • {channel}
+    </div>
+</div>
+""")
+
+
+@functools.lru_cache(maxsize=128)
+def _customer_card_html(message: str, turn: int, channel: str) -> str:
+    return _CUSTOMER_CARD_TPL.format_map({
+        "safe_message": esc(message),
+        "turn": turn,
+        "channel": channel
+    })
+
+
+def render_customer_card(buf: io.StringIO, message: str, turn: int, channel: str):
+    """Append the customer message card, reusing the markup across reruns."""
+    buf.write(_customer_card_html(message, turn, channel))
+
+
+def render_stage_flow(buf: io.StringIO, current_stage: str):
+    """Append the stage flow indicator."""
     current = (current_stage or "").lower()
-    for i, stage in enumerate(stages):
-        is_active = stage == current
-        stage_class = "active" if is_active else "inactive"
-        stage_html += f'<div class="stage-item {stage_class}">{stage_labels.get(stage, stage.title())}</div>'
-        if i < len(stages) - 1:
-            stage_html += '<span class="stage-arrow">→</span>'
-    stage_html += '</div>'
+    items = '<span class="stage-arrow">→</span>'.join(
+        f'<div class="stage-item {"active" if stage == current else "inactive"}">{_STAGE_LABELS[stage]}</div>'
+        for stage in _STAGES
+    )
     
-    st.markdown(stage_html, unsafe_allow_html=True)
+    buf.write(f'<div class="stage-flow">{items}</div>')
 
 
-def render_situation_card(detection: Dict[str, Any]):
+_SITUATION_CARD_TPL = _template("""
+<div class="card">
+    <div class="card-header">
+        <span class="card-title">Situation Detected</span>
+    </div>
+    <div style="margin-bottom: 0.5rem;">
+        <span class="badge badge-situation">{situation_label}</span>
+    </div>
+    <div>
+        <div style="display: flex; justify-content: space-between; margin-bottom: 0.25rem;">
+            <span style="font-size: 0.8rem; color: var(--text-secondary);">Confidence</span>
+            <span style="font-size: 0.8rem; color: var(--text-primary); font-weight: 600;">{situation_pct}</span>
+        </div>
+        <div class="confidence-bar">
+            <div class="confidence-fill {confidence_class}" style="width: {confidence_width}%;"></div>
+        </div>
+    </div>
+</div>
+""")
+
+
+def render_situation_card(detection: Dict[str, Any], confidence_pct: Dict[str, str]):
     """Render the situation detection card."""
     situation = detection.get("detected_situation", "unknown")
     confidence = detection.get("situation_confidence", 0.0)
     
     confidence_class = "confidence-high" if confidence >= 0.8 else "confidence-medium" if confidence >= 0.5 else "confidence-low"
     
-    situation_label = esc(str(situation).replace("_", " ").title())
-    st.markdown(f"""
-    <div class="card">
-        <div class="card-header">
-            <span class="card-title">Situation Detected</span>
-        </div>
-        <div style="margin-bottom: 0.5rem;">
-            <span class="badge badge-situation">{situation_label}</span>
-        </div>
-        <div>
-            <div style="display: flex; justify-content: space-between; margin-bottom: 0.25rem;">
-                <span style="font-size: 0.8rem; color: var(--text-secondary);">Confidence</span>
-                <span style="font-size: 0.8rem; color: var(--text-primary); font-weight: 600;">{confidence:.0%}</span>
-            </div>
-            <div class="confidence-bar">
-                <div class="confidence-fill {confidence_class}" style="width: {confidence * 100}%;"></div>
-            </div>
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
-
-
-def render_context_panel(detection: Dict[str, Any], captured_context: Dict[str, Any], qualification: Dict[str, bool]):
+    st.markdown(_SITUATION_CARD_TPL.format_map({
+        "situation_label": esc(humanize(situation)),
+        "situation_pct": confidence_pct["situation"],
+        "confidence_class": confidence_class,
+        "confidence_width": confidence * 100
+    }), unsafe_allow_html=True)
+
+
+def render_context_panel(
+    detection: Dict[str, Any],
+    captured_context: Dict[str, Any],
+    qualification: Dict[str, bool],
+    confidence_pct: Dict[str, str]
+):
     """Render context and qualification panels."""
     persona = detection.get("detected_persona", "unknown")
-    persona_confidence = detection.get("persona_confidence", 0.0)
     
     col1, col2 = st.columns(2)
     
     with col1:
-        persona_label = esc(str(persona).replace("_", " ").title())
-        st.markdown(f"""
-        <div class="card">
-            <div class="card-header">
-                <span class="card-title">Context & Persona</span>
-            </div>
-            <div style="margin-bottom: 1rem;">
-                <span class="badge badge-persona">{persona_label}</span>
-                <span style="font-size: 0.75rem; color: var(--text-muted); margin-left: 0.5rem;">{persona_confidence:.0%} confidence</span>
-            </div>
-            <div>
-                <div style="font-size: 0.75rem; color: var(--text-secondary); margin-bottom: 0.5rem; text-transform: uppercase;">Captured Context</div>
-        """, unsafe_allow_html=True)
+        persona_label = esc(humanize(persona))
+        buf = io.StringIO()
+        buf.write(
+            '<div class="card">'
+            '<div class="card-header"><span class="card-title">Context & Persona</span></div>'
+            '<div style="margin-bottom: 1rem;">'
+            f'<span class="badge badge-persona">{persona_label}</span>'
+            f'<span style="font-size: 0.75rem; color: var(--text-muted); margin-left: 0.5rem;">{confidence_pct["persona"]} confidence</span>'
+            '</div>'
+            '<div>'
+            '<div class="eyebrow" style="color: var(--text-secondary);">Captured Context</div>'
+        )
         
         # Render context pills
         if captured_context:
-            pills_html = ""
-            for key, value in captured_context.items():
-                if value:
-                    pills_html += f'<span class="context-pill"><span class="context-pill-key">{esc(key)}:</span> {esc(value)}</span>'
-            st.markdown(pills_html, unsafe_allow_html=True)
+            buf.write("".join(
+                f'<span class="context-pill"><span class="context-pill-key">{esc(key)}:</span> {esc(value)}</span>'
+                for key, value in captured_context.items() if value
+            ))
         else:
-            st.markdown('<span style="color: var(--text-muted); font-size: 0.8rem;">No context captured yet</span>', unsafe_allow_html=True)
+            buf.write('<span style="color: var(--text-muted); font-size: 0.8rem;">No context captured yet</span>')
         
-        st.markdown("</div></div>", unsafe_allow_html=True)
+        buf.write("</div></div>")
+        st.markdown(buf.getvalue(), unsafe_allow_html=True)
     
     with col2:
-        st.markdown("""
-        <div class="card">
-            <div class="card-header">
-                <span class="card-title">Qualification Checklist</span>
-            </div>
-            <div>
-        """, unsafe_allow_html=True)
-        
-        qualification_labels = {
-            "need_identified": "Need Identified",
-            "pain_expressed": "Pain Expressed",
-            "product_interest": "Product Interest",
-            "budget_discussed": "Budget Discussed",
-            "timeline_known": "Timeline Known",
-            "decision_maker_known": "Decision Maker Known"
-        }
+        buf = io.StringIO()
+        buf.write(
+            '<div class="card">'
+            '<div class="card-header"><span class="card-title">Qualification Checklist</span></div>'
+            '<div>'
+        )
         
-        for key, label in qualification_labels.items():
-            checked = qualification.get(key, False)
-            check_class = "checkbox-checked" if checked else "checkbox-unchecked"
-            check_symbol = "✓" if checked else "○"
-            st.markdown(f"""
-            <div class="qualification-item">
-                <span class="{check_class}">{check_symbol}</span>
-                <span>{label}</span>
-            </div>
-            """, unsafe_allow_html=True)
+        buf.write("".join(
+            '<div class="qualification-item"><span class="checkbox-checked">✓</span>'
+            f'<span>{label}</span></div>'
+            if qualification.get(key, False) else
+            '<div class="qualification-item"><span class="checkbox-unchecked">○</span>'
+            f'<span>{label}</span></div>'
+            for key, label in _QUALIFICATION_LABELS.items()
+        ))
         
-        st.markdown("</div></div>", unsafe_allow_html=True)
+        buf.write("</div></div>")
+        st.markdown(buf.getvalue(), unsafe_allow_html=True)
 
 
 def render_reasoning_trace(detection: Dict[str, Any], recommendation: Dict[str, Any]):
@@ -704,15 +840,16 @@ def render_reasoning_trace(detection: Dict[str, Any], recommendation: Dict[str,
     if not signal_match:
         signal_match = "No signal detected"
     signal_match = esc(signal_match)
-    situation_label = esc(str(situation).replace("_", " ").title())
+    situation_label = esc(humanize(situation))
     principle_label = esc(principle)
     approach_label = esc(approach)
     
-    st.markdown("""
-    <div style="margin: 1.5rem 0;">
-        <div class="card-title" style="margin-bottom: 1rem;">Reasoning Trace</div>
-        <div class="reasoning-trace">
-    """, unsafe_allow_html=True)
+    buf = io.StringIO()
+    buf.write(
+        '<div style="margin: 1.5rem 0;">'
+        '<div class="card-title" style="margin-bottom: 1rem;">Reasoning Trace</div>'
+        '<div class="reasoning-trace">'
+    )
     
     trace_items = [
         ("Signal", signal_match),
@@ -721,18 +858,50 @@ def render_reasoning_trace(detection: Dict[str, Any], recommendation: Dict[str,
         ("Approach", approach_label)
     ]
     
-    for i, (label, content) in enumerate(trace_items):
-        st.markdown(f"""
-        <div class="trace-box">
-            <div class="trace-box-label">{label}</div>
-            <div class="trace-box-content">{content}</div>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        if i < len(trace_items) - 1:
-            st.markdown('<span class="trace-arrow">→</span>', unsafe_allow_html=True)
+    buf.write('<span class="trace-arrow">→</span>'.join(
+        f'<div class="trace-box">'
+        f'<div class="trace-box-label">{label}</div>'
+        f'<div class="trace-box-content">{content}</div>'
+        f'</div>'
+        for label, content in trace_items
+    ))
     
-    st.markdown("</div></div>", unsafe_allow_html=True)
+    buf.write("</div></div>")
+    st.markdown(buf.getvalue(), unsafe_allow_html=True)
+
+
+_GROUNDING_TPL = _template("""
+<div class="grounding-panel reveal-delay">
+    <div class="grounding-header">
+        ⚡ Grounding & Reasoning
+    </div>
+    
+    <div style="margin-bottom: 1rem;">
+        <div class="eyebrow">Principle Applied</div>
+        <div style="font-size: 1.5rem; font-weight: 700; color: var(--accent-purple); margin-bottom: 0.5rem;">{principle_text}</div>
+        <div style="font-size: 0.75rem; color: var(--text-muted);">ID: {principle_id_text}</div>
+    </div>
+    
+    <div class="source-citation">
+        📚 {source_text}
+    </div>
+    
+    <div style="margin: 1rem 0;">
+        <div class="eyebrow">Signal Detected In</div>
+        <div class="signal-match">"{signal_text}"</div>
+    </div>
+    
+    <div style="margin: 1rem 0;">
+        <div class="eyebrow">Tactical Approach</div>
+        <div style="font-size: 0.9rem; color: var(--text-primary); font-weight: 500;">{approach_text}</div>
+    </div>
+    
+    <div style="margin-top: 1.5rem; padding: 1rem; background: rgba(167, 139, 250, 0.05); border-radius: 8px; border: 1px solid rgba(167, 139, 250, 0.2);">
+        <div class="eyebrow" style="color: var(--accent-purple); font-weight: 600;">Why This Works</div>
+        <div style="font-size: 0.85rem; color: var(--text-secondary); line-height: 1.6;">{why_text}</div>
+    </div>
+</div>
+""")
 
 
 def render_grounding_panel(recommendation: Dict[str, Any], detection: Dict[str, Any]):
@@ -747,161 +916,163 @@ def render_grounding_panel(recommendation: Dict[str, Any], detection: Dict[str,
     # Ensure we have valid values
     if not signal_match:
         signal_match = "No customer message provided"
-    principle_text = esc(str(principle).upper())
-    principle_id_text = esc(principle_id)
-    source_text = esc(source)
-    approach_text = esc(approach)
-    why_text = esc(why_it_works)
-    signal_text = esc(signal_match)
     
-    st.markdown(f"""
-    <div class="grounding-panel reveal-delay">
-        <div class="grounding-header">
-            ⚡ Grounding & Reasoning
-        </div>
-        
-        <div style="margin-bottom: 1rem;">
-            <div style="font-size: 0.75rem; color: var(--text-muted); text-transform: uppercase; margin-bottom: 0.5rem;">Principle Applied</div>
-            <div style="font-size: 1.5rem; font-weight: 700; color: var(--accent-purple); margin-bottom: 0.5rem;">{principle_text}</div>
-            <div style="font-size: 0.75rem; color: var(--text-muted);">ID: {principle_id_text}</div>
-        </div>
-        
-        <div class="source-citation">
-            📚 {source_text}
-        </div>
-        
-        <div style="margin: 1rem 0;">
-            <div style="font-size: 0.75rem; color: var(--text-muted); text-transform: uppercase; margin-bottom: 0.5rem;">Signal Detected In</div>
-            <div class="signal-match">"{signal_text}"</div>
-        </div>
-        
-        <div style="margin: 1rem 0;">
-            <div style="font-size: 0.75rem; color: var(--text-muted); text-transform: uppercase; margin-bottom: 0.5rem;">Tactical Approach</div>
-            <div style="font-size: 0.9rem; color: var(--text-primary); font-weight: 500;">{approach_text}</div>
-        </div>
-        
-        <div style="margin-top: 1.5rem; padding: 1rem; background: rgba(167, 139, 250, 0.05); border-radius: 8px; border: 1px solid rgba(167, 139, 250, 0.2);">
-            <div style="font-size: 0.75rem; color: var(--accent-purple); text-transform: uppercase; margin-bottom: 0.5rem; font-weight: 600;">Why This Works</div>
-            <div style="font-size: 0.85rem; color: var(--text-secondary); line-height: 1.6;">{why_text}</div>
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(_GROUNDING_TPL.format_map({
+        "principle_text": esc(str(principle).upper()),
+        "principle_id_text": esc(principle_id),
+        "source_text": esc(source),
+        "approach_text": esc(approach),
+        "why_text": esc(why_it_works),
+        "signal_text": esc(signal_match)
+    }), unsafe_allow_html=True)
+
+
+_RESPONSE_CARD_TPL = _template("""
+<div class="response-card reveal">
+    <div class="eyebrow eyebrow-accent" style="color: var(--accent-green);">{title_text}</div>
+    <div style="font-size: 1rem; color: var(--text-primary); line-height: 1.6;">{response_text}</div>
+</div>
+""")
 
 
 def render_response_card(response: str, title: str = "Recommended Response"):
     """Render the recommended response card."""
-    response_text = esc(response)
-    title_text = esc(title)
-    st.markdown(f"""
-    <div class="response-card reveal">
-        <div style="font-size: 0.75rem; color: var(--accent-green); text-transform: uppercase; margin-bottom: 0.75rem; font-weight: 600;">{title_text}</div>
-        <div style="font-size: 1rem; color: var(--text-primary); line-height: 1.6;">{response_text}</div>
+    st.markdown(_RESPONSE_CARD_TPL.format_map({
+        "title_text": esc(title),
+        "response_text": esc(response)
+    }), unsafe_allow_html=True)
+
+
+_FALLBACK_CARD_TPL = _template("""
+<div class="fallback-card">
+    <div class="eyebrow eyebrow-accent" style="color: var(--accent-orange);">If They Still Resist</div>
+    <div style="font-size: 0.85rem; color: var(--text-secondary); margin-bottom: 0.5rem;">
+        <strong>Principle:</strong> {principle_text}
     </div>
-    """, unsafe_allow_html=True)
+    <div style="font-size: 0.9rem; color: var(--text-primary); line-height: 1.6;">{response_text}</div>
+</div>
+""")
 
 
 def render_fallback_card(fallback: Dict[str, Any]):
     """Render the fallback card."""
     principle = fallback.get("principle", "Unknown")
     response = fallback.get("response", "")
-    principle_text = esc(principle)
-    response_text = esc(response)
     
-    st.markdown(f"""
-    <div class="fallback-card">
-        <div style="font-size: 0.75rem; color: var(--accent-orange); text-transform: uppercase; margin-bottom: 0.75rem; font-weight: 600;">If They Still Resist</div>
-        <div style="font-size: 0.85rem; color: var(--text-secondary); margin-bottom: 0.5rem;">
-            <strong>Principle:</strong> {principle_text}
-        </div>
-        <div style="font-size: 0.9rem; color: var(--text-primary); line-height: 1.6;">{response_text}</div>
+    st.markdown(_FALLBACK_CARD_TPL.format_map({
+        "principle_text": esc(principle),
+        "response_text": esc(response)
+    }), unsafe_allow_html=True)
+
+
+_NEXT_PROBE_TPL = _template("""
+<div class="probe-card">
+    <div class="eyebrow eyebrow-accent" style="color: var(--accent-blue);">Next Probe</div>
+    <div style="font-size: 0.85rem; color: var(--text-secondary); margin-bottom: 0.5rem;">
+        <strong>Target:</strong> {target_text}
     </div>
-    """, unsafe_allow_html=True)
+    <div style="font-size: 0.9rem; color: var(--text-primary); line-height: 1.6;">{question_text}</div>
+</div>
+""")
 
 
 def render_next_probe_card(next_probe: Dict[str, Any]):
     """Render the next probe card."""
     target = next_probe.get("target", "")
     question = next_probe.get("question", "")
-    target_text = esc(str(target).replace("_", " ").title())
-    question_text = esc(question)
     
-    st.markdown(f"""
-    <div class="probe-card">
-        <div style="font-size: 0.75rem; color: var(--accent-blue); text-transform: uppercase; margin-bottom: 0.75rem; font-weight: 600;">Next Probe</div>
-        <div style="font-size: 0.85rem; color: var(--text-secondary); margin-bottom: 0.5rem;">
-            <strong>Target:</strong> {target_text}
-        </div>
-        <div style="font-size: 0.9rem; color: var(--text-primary); line-height: 1.6;">{question_text}</div>
+    st.markdown(_NEXT_PROBE_TPL.format_map({
+        "target_text": esc(humanize(target)),
+        "question_text": esc(question)
+    }), unsafe_allow_html=True)
+
+
+_SUMMARY_STRIP_TPL = _template("""
+<div class="summary-strip">
+    <div class="summary-item">
+        <div class="summary-label">Situation</div>
+        <div class="summary-value">{situation_label}</div>
+        <div class="summary-meta">{situation_pct} confidence</div>
     </div>
-    """, unsafe_allow_html=True)
+    <div class="summary-item">
+        <div class="summary-label">Persona</div>
+        <div class="summary-value">{persona_label}</div>
+        <div class="summary-meta">{persona_pct} confidence</div>
+    </div>
+    <div class="summary-item">
+        <div class="summary-label">Micro-Stage</div>
+        <div class="summary-value">{stage_label}</div>
+        <div class="summary-meta">Deal flow</div>
+    </div>
+</div>
+""")
+
 
-def render_summary_strip(detection: Dict[str, Any]):
+def render_summary_strip(buf: io.StringIO, detection: Dict[str, Any], confidence_pct: Dict[str, str]):
+    """Append the situation / persona / stage summary strip."""
     situation = detection.get("detected_situation", "unknown")
     persona = detection.get("detected_persona", "unknown")
     micro_stage = detection.get("micro_stage", "discovery")
-    situation_confidence = detection.get("situation_confidence", 0.0)
-    persona_confidence = detection.get("persona_confidence", 0.0)
-
-    situation_label = esc(str(situation).replace("_", " ").title())
-    persona_label = esc(str(persona).replace("_", " ").title())
-    stage_label = esc(str(micro_stage).replace("_", " ").title())
-
-    st.markdown(f"""
-    <div class="summary-strip">
-        <div class="summary-item">
-            <div class="summary-label">Situation</div>
-            <div class="summary-value">{situation_label}</div>
-            <div class="summary-meta">{situation_confidence:.0%} confidence</div>
-        </div>
-        <div class="summary-item">
-            <div class="summary-label">Persona</div>
-            <div class="summary-value">{persona_label}</div>
-            <div class="summary-meta">{persona_confidence:.0%} confidence</div>
-        </div>
-        <div class="summary-item">
-            <div class="summary-label">Micro-Stage</div>
-            <div class="summary-value">{stage_label}</div>
-            <div class="summary-meta">Deal flow</div>
+
+    buf.write(_SUMMARY_STRIP_TPL.format_map({
+        "situation_label": esc(humanize(situation)),
+        "persona_label": esc(humanize(persona)),
+        "stage_label": esc(humanize(micro_stage)),
+        "situation_pct": confidence_pct["situation"],
+        "persona_pct": confidence_pct["persona"]
+    }))
+
+
+_SIGNALS_PANEL_TPL = _template("""
+<div class="card">
+    <div class="card-header">
+        <span class="card-title">Signals & Risks</span>
+    </div>
+    <div style="margin-bottom: 0.75rem;">
+        <div class="eyebrow" style="color: var(--text-secondary); margin-bottom: 0;">Signal Confidence</div>
+        <div style="font-size: 0.9rem; color: var(--text-primary); margin-top: 0.25rem;">
+            Situation: {situation_pct} • Persona: {persona_pct}
         </div>
     </div>
-    """, unsafe_allow_html=True)
-
+    <div>
+        <div class="eyebrow" style="color: var(--text-secondary); margin-bottom: 0;">Missing Qualification</div>
+        <div style="font-size: 0.85rem; color: var(--text-primary); margin-top: 0.25rem;">{missing_text}</div>
+    </div>
+</div>
+""")
 
-def render_signals_panel(detection: Dict[str, Any], qualification: Dict[str, bool]):
-    situation_confidence = detection.get("situation_confidence", 0.0)
-    persona_confidence = detection.get("persona_confidence", 0.0)
 
-    qualification_labels = {
-        "need_identified": "Need Identified",
-        "pain_expressed": "Pain Expressed",
-        "product_interest": "Product Interest",
-        "budget_discussed": "Budget Discussed",
-        "timeline_known": "Timeline Known",
-        "decision_maker_known": "Decision Maker Known"
-    }
+def render_signals_panel(qualification: Dict[str, bool], confidence_pct: Dict[str, str]):
 
-    missing = [label for key, label in qualification_labels.items() if not qualification.get(key, False)]
+    missing = [label for key, label in _QUALIFICATION_LABELS.items() if not qualification.get(key, False)]
     missing_display = ", ".join(missing[:3]) if missing else "None"
     if len(missing) > 3:
         missing_display += f" (+{len(missing) - 3} more)"
 
-    st.markdown(f"""
-    <div class="card">
-        <div class="card-header">
-            <span class="card-title">Signals & Risks</span>
-        </div>
-        <div style="margin-bottom: 0.75rem;">
-            <div style="font-size: 0.75rem; color: var(--text-secondary); text-transform: uppercase;">Signal Confidence</div>
-            <div style="font-size: 0.9rem; color: var(--text-primary); margin-top: 0.25rem;">
-                Situation: {situation_confidence:.0%} • Persona: {persona_confidence:.0%}
-            </div>
-        </div>
-        <div>
-            <div style="font-size: 0.75rem; color: var(--text-secondary); text-transform: uppercase;">Missing Qualification</div>
-            <div style="font-size: 0.85rem; color: var(--text-primary); margin-top: 0.25rem;">{esc(missing_display)}</div>
-        </div>
+    st.markdown(_SIGNALS_PANEL_TPL.format_map({
+        "situation_pct": confidence_pct["situation"],
+        "persona_pct": confidence_pct["persona"],
+        "missing_text": esc(missing_display)
+    }), unsafe_allow_html=True)
+
+
+_METRICS_BAR_TPL = _template("""
+<div class="metrics-bar">
+    <div class="metric-item">
+        <span class="metric-label">Latency:</span>
+        <span class="metric-value">{latency}ms</span>
+    </div>
+    <div class="metric-item">
+        <span class="metric-label">Source:</span>
+        <span class="metric-value">{source}</span>
+    </div>
+    <div class="metric-item">
+        <span class="metric-label">Grounding:</span>
+        <span class="metric-value" style="color: var(--accent-green);">✓ Verified</span>
     </div>
-    """, unsafe_allow_html=True)
+</div>
+""")
+
 
 def render_metrics_bar(system: Dict[str, Any]):
     """Render the metrics bar."""
@@ -911,31 +1082,22 @@ def render_metrics_bar(system: Dict[str, Any]):
     # Determine source (simplified - would need cache info from API)
     source = "API Response"
     
-    st.markdown(f"""
-    <div class="metrics-bar">
-        <div class="metric-item">
-            <span class="metric-label">Latency:</span>
-            <span class="metric-value">{latency}ms</span>
-        </div>
-        <div class="metric-item">
-            <span class="metric-label">Source:</span>
-            <span class="metric-value">{source}</span>
-        </div>
-        <div class="metric-item">
-            <span class="metric-label">Grounding:</span>
-            <span class="metric-value" style="color: var(--accent-green);">✓ Verified</span>
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(_METRICS_BAR_TPL.format_map({
+        "latency": latency,
+        "source": source
+    }), unsafe_allow_html=True)
 
 
 def main():
     """Main application."""
+    # Re-emitted every rerun: Streamlit drops elements a rerun doesn't render
+    st.markdown(_CSS, unsafe_allow_html=True)
     render_header()
     
     # Sidebar
     with st.sidebar:
         st.markdown("### Input Panel")
+        health_slot = st.empty()
         
         # Session ID
         session_id = st.text_input(
@@ -980,19 +1142,23 @@ def main():
         
         # Analyze button
         analyze_button = st.button("🔍 Analyze", type="primary", use_container_width=True)
+        
+        # On analyze reruns the /chat call itself reports connectivity, so skip the probe
+        if not (analyze_button and customer_message) and not api_is_healthy():
+            health_slot.warning(f"API health check failed at {API_BASE_URL}.")
     
     # Main content
     if analyze_button and customer_message:
+        # Parse prior context if provided
+        product_context = None
+        if prior_context:
+            try:
+                product_context = parse_prior_context(prior_context)
+            except orjson.JSONDecodeError:
+                st.warning("Invalid JSON in prior context. Ignoring.")
+        
+        # Only the network round-trip runs under the spinner; rendering follows it
         with st.spinner("Analyzing message..."):
-            # Parse prior context if provided
-            product_context = None
-            if prior_context:
-                try:
-                    product_context = json.loads(prior_context)
-                except json.JSONDecodeError:
-                    st.warning("Invalid JSON in prior context. Ignoring.")
-            
-            # Call API
             result = call_api(
                 customer_message,
                 session_id,
@@ -1000,84 +1166,76 @@ def main():
                 channel=channel,
                 turn=int(turn),
             )
+        
+        if result:
+            st.session_state.last_response = result
+            agent_dashboard = result.get("agent_dashboard", {})
+            customer_facing = result.get("customer_facing", {})
+            
+            # Dashboard sections, missing or null ones as empty dicts
+            (
+                detection,
+                qualification,
+                captured_context,
+                recommendation,
+                fallback,
+                next_probe,
+                system
+            ) = (agent_dashboard.get(key) or {} for key in _DASHBOARD_SECTIONS)
+            
+            micro_stage = detection.get("micro_stage", "discovery")
+            confidence_pct = format_confidences(detection)
+            
+            # Customer message, summary strip and stage flow are contiguous
+            # static HTML: buffer them and flush in a single st.markdown
+            buf = io.StringIO()
+            render_customer_card(buf, customer_message, int(turn), channel)
+            render_summary_strip(buf, detection, confidence_pct)
+            render_stage_flow(buf, micro_stage)
+            st.markdown(buf.getvalue(), unsafe_allow_html=True)
+            
+            # Situation and signals in columns
+            col1, col2 = st.columns([1, 1])
+            with col1:
+                render_situation_card(detection, confidence_pct)
+            with col2:
+                render_signals_panel(qualification, confidence_pct)
             
-            if result:
-                st.session_state.last_response = result
-                agent_dashboard = result.get("agent_dashboard", {})
-                customer_facing = result.get("customer_facing", {})
-                
-                # Customer message display
-                safe_message = esc(customer_message)
-                st.markdown(f"""
-                <div class="card">
-                    <div class="card-header">
-                        <span class="card-title">Customer Said</span>
-                    </div>
-                    <div style="font-size: 1rem; color: var(--text-primary); line-height: 1.6;">"{safe_message}"</div>
-                    <div style="margin-top: 0.5rem; font-size: 0.75rem; color: var(--text-muted);">
-                        Turn #{turn} • {channel}
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
-                
-                # Detection
-                detection = agent_dashboard.get("detection", {})
-                micro_stage = detection.get("micro_stage", "discovery")
-                
-                # Summary strip
-                render_summary_strip(detection)
-
-                # Stage flow
-                render_stage_flow(micro_stage)
-                
-                # Situation and signals in columns
-                col1, col2 = st.columns([1, 1])
+            # Context panel
+            render_context_panel(detection, captured_context, qualification, confidence_pct)
+            
+            tabs = st.tabs(["Response", "Reasoning", "Grounding", "JSON"])
+
+            with tabs[0]:
+                response = customer_facing.get("response", "")
+                if response:
+                    render_response_card(response)
+                col1, col2 = st.columns(2)
                 with col1:
-                    render_situation_card(detection)
+                    if fallback:
+                        render_fallback_card(fallback)
                 with col2:
-                    render_signals_panel(detection, agent_dashboard.get("qualification_checklist", {}))
-                
-                # Context panel
-                captured_context = agent_dashboard.get("captured_context", {})
-                qualification = agent_dashboard.get("qualification_checklist", {})
-                render_context_panel(detection, captured_context, qualification)
-                
-                recommendation = agent_dashboard.get("recommendation", {})
-
-                tabs = st.tabs(["Response", "Reasoning", "Grounding", "JSON"])
-
-                with tabs[0]:
-                    response = customer_facing.get("response", "")
-                    if response:
-                        render_response_card(response)
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        fallback = agent_dashboard.get("fallback", {})
-                        if fallback:
-                            render_fallback_card(fallback)
-                    with col2:
-                        next_probe = agent_dashboard.get("next_probe", {})
-                        if next_probe:
-                            render_next_probe_card(next_probe)
-
-                with tabs[1]:
-                    if st.session_state.show_trace:
-                        render_reasoning_trace(detection, recommendation)
-                    else:
-                        st.info("Enable 'Show Trace' to view reasoning steps.")
-
-                with tabs[2]:
-                    render_grounding_panel(recommendation, detection)
-
-                with tabs[3]:
-                    if st.session_state.show_json:
-                        st.json(result)
-                    else:
-                        st.info("Enable 'Show JSON' to view the raw response.")
-                
-                # Metrics
-                system = agent_dashboard.get("system", {})
-                render_metrics_bar(system)
+                    if next_probe:
+                        render_next_probe_card(next_probe)
+
+            with tabs[1]:
+                if show_trace:
+                    render_reasoning_trace(detection, recommendation)
+                else:
+                    st.info("Enable 'Show Trace' to view reasoning steps.")
+
+            with tabs[2]:
+                render_grounding_panel(recommendation, detection)
+
+            with tabs[3]:
+                if show_json:
+                    # A pre-serialized string skips st.json's stdlib json.dumps
+                    st.json(orjson.dumps(result).decode(), expanded=False)
+                else:
+                    st.info("Enable 'Show JSON' to view the raw response.")
+            
+            # Metrics
+            render_metrics_bar(system)
     
     elif st.session_state.last_response:
         # Show last response if available
@@ -1086,15 +1244,7 @@ def main():
     
     else:
         # Welcome message
-        st.markdown("""
-        <div class="card" style="text-align: center; padding: 3rem;">
-            <h2 style="color: var(--text-primary); margin-bottom: 1rem;">Welcome to Sales AI Coach</h2>
-            <p style="color: var(--text-secondary); line-height: 1.6;">
-                Enter a customer message in the sidebar and click "Analyze" to get psychology-backed recommendations
-                with full reasoning trace and grounding information.
-            </p>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(_WELCOME_HTML, unsafe_allow_html=True)
 
 
 if __name__ == "__main__":
@@ -4,11 +4,12 @@ Pytest configuration and shared fixtures for unit tests.
 Provides common fixtures and mocks used across multiple test files.
 """
 import pytest
+from types import SimpleNamespace
 from unittest.mock import AsyncMock, MagicMock
 
 
-# Configure pytest-asyncio
-pytest_plugins = ('pytest_asyncio',)
+# Fixed text-embedding-3-small sized vector; no test inspects the values
+_DUMMY_EMBEDDING = [0.0] * 1536
 
 
 # =============================================================================
@@ -18,37 +19,29 @@ pytest_plugins = ('pytest_asyncio',)
 @pytest.fixture
 def mock_anthropic_client():
     """Mock Anthropic client for testing."""
-    client = MagicMock()
-    client.messages = MagicMock()
-    client.messages.create = AsyncMock(return_value=MagicMock(
-        content=[MagicMock(text='{"test": "response"}')]
+    # Plain namespaces for the plumbing; only the awaited leaf is a mock
+    create = AsyncMock(return_value=SimpleNamespace(
+        content=[SimpleNamespace(text='{"test": "response"}')]
     ))
-    return client
+    return SimpleNamespace(messages=SimpleNamespace(create=create))
 
 
 @pytest.fixture
 def mock_openai_client():
     """Mock OpenAI client for testing."""
-    client = MagicMock()
-    client.chat = MagicMock()
-    client.chat.completions = MagicMock()
-    client.chat.completions.create = AsyncMock(return_value=MagicMock(
-        choices=[MagicMock(message=MagicMock(content='{"test": "response"}'))]
+    create = AsyncMock(return_value=SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content='{"test": "response"}'))]
     ))
-    return client
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
 
 
 @pytest.fixture
 def mock_openai_embedding_client():
     """Mock OpenAI embedding client for testing."""
-    import numpy as np
-    
-    client = MagicMock()
-    client.embeddings = MagicMock()
-    client.embeddings.create = AsyncMock(return_value=MagicMock(
-        data=[MagicMock(embedding=np.random.rand(1536).astype(np.float32).tolist())]
+    create = AsyncMock(return_value=SimpleNamespace(
+        data=[SimpleNamespace(embedding=_DUMMY_EMBEDDING)]
     ))
-    return client
+    return SimpleNamespace(embeddings=SimpleNamespace(create=create))
 
 
 # =============================================================================
@@ -261,6 +254,18 @@ def sample_selector_rules():
     }
 
 
+# =============================================================================
+# Reporting Hooks
+# =============================================================================
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """Expose each phase's report as item.rep_<phase> for fixture teardown."""
+    outcome = yield
+    report = outcome.get_result()
+    setattr(item, f"rep_{report.when}", report)
+
+
 # =============================================================================
 # Test Data Fixtures
 # =============================================================================
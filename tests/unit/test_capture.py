@@ -4,9 +4,11 @@ Unit tests for CaptureEngine.
 Tests extraction logic, prompt compression, fallback handling, and LLM API interaction.
 """
 import pytest
+import asyncio
 import json
 from unittest.mock import AsyncMock, MagicMock, patch
 from sales_agent.engine.capture import CaptureEngine
+from sales_agent.engine.exact_cache import ExactMatchCache
 
 
 @pytest.fixture
@@ -72,11 +74,13 @@ def mock_llm_pool(mock_anthropic_client):
 class TestCaptureEngineInitialization:
     """Test CaptureEngine initialization."""
     
+    @pytest.mark.filterwarnings("ignore:CaptureEngine without llm_pool:DeprecationWarning")
     async def test_schema_loaded(self, sample_capture_schema):
         """Test schema is loaded correctly."""
         engine = CaptureEngine(sample_capture_schema)
         assert engine.schema == sample_capture_schema
     
+    @pytest.mark.filterwarnings("ignore:CaptureEngine without llm_pool:DeprecationWarning")
     async def test_slots_extracted(self, sample_capture_schema):
         """Test slots are extracted correctly."""
         engine = CaptureEngine(sample_capture_schema)
@@ -84,6 +88,7 @@ class TestCaptureEngineInitialization:
         assert "budget_signal" in engine.slots
         assert "objection" in engine.slots
     
+    @pytest.mark.filterwarnings("ignore:CaptureEngine without llm_pool:DeprecationWarning")
     async def test_slot_names_pre_computed(self, sample_capture_schema):
         """Test slot_names pre-computed."""
         engine = CaptureEngine(sample_capture_schema)
@@ -91,6 +96,13 @@ class TestCaptureEngineInitialization:
         assert "pain" in engine.slot_names
         assert "budget_signal" in engine.slot_names
     
+    @pytest.mark.filterwarnings("ignore:CaptureEngine without llm_pool:DeprecationWarning")
+    async def test_prompt_prefix_pre_computed(self, sample_capture_schema):
+        """Test prompt prefix with slot names is built at init."""
+        engine = CaptureEngine(sample_capture_schema)
+        assert "Slots: pain, budget_signal, objection\n" in engine._prompt_prefix
+        assert engine._prompt_prefix.endswith("Context: ")
+    
     async def test_router_initialization(self, sample_capture_schema, mock_llm_router):
         """Test router initialization."""
         engine = CaptureEngine(sample_capture_schema, llm_router=mock_llm_router)
@@ -101,6 +113,20 @@ class TestCaptureEngineInitialization:
         engine = CaptureEngine(sample_capture_schema, llm_pool=mock_llm_pool)
         assert engine.client == mock_llm_pool.get_anthropic_client.return_value
     
+    async def test_engines_share_pool_client(self, sample_capture_schema, mock_llm_pool):
+        """Test engines built from one pool reuse its client."""
+        engine1 = CaptureEngine(sample_capture_schema, llm_pool=mock_llm_pool)
+        engine2 = CaptureEngine(sample_capture_schema, llm_pool=mock_llm_pool)
+        assert engine1.client is engine2.client
+        assert engine1.client is mock_llm_pool.get_anthropic_client.return_value
+    
+    async def test_direct_client_deprecated(self, sample_capture_schema, mock_anthropic_client):
+        """Test building a direct client without a pool warns."""
+        with patch('sales_agent.engine.capture.AsyncAnthropic', return_value=mock_anthropic_client):
+            with pytest.warns(DeprecationWarning, match="LLMConnectionPool"):
+                CaptureEngine(sample_capture_schema)
+    
+    @pytest.mark.filterwarnings("ignore:CaptureEngine without llm_pool:DeprecationWarning")
     async def test_direct_client_initialization(self, sample_capture_schema, mock_anthropic_client):
         """Test direct client initialization."""
         with patch.dict('os.environ', {'ANTHROPIC_API_KEY': 'test-key'}):
@@ -133,6 +159,7 @@ class TestExtraction:
         assert call_kwargs["max_tokens"] == 500
         assert call_kwargs["complexity"] == "medium"
     
+    @pytest.mark.filterwarnings("ignore:CaptureEngine without llm_pool:DeprecationWarning")
     async def test_successful_extraction_with_client(self, sample_capture_schema, mock_anthropic_client):
         """Test successful extraction (mock direct client)."""
         with patch('sales_agent.engine.capture.retry_with_backoff', new_callable=AsyncMock) as mock_retry:
@@ -206,6 +233,19 @@ class TestExtraction:
         assert "budget_signal" not in result["slots"] or not result["slots"].get("budget_signal")
         assert "objection" not in result["slots"] or not result["slots"].get("objection")
     
+    async def test_slots_outside_schema_dropped(self, sample_capture_schema, mock_llm_router):
+        """Test slot names not in the schema are dropped."""
+        mock_llm_router.call = AsyncMock(return_value=(
+            '{"slots": {"pain": "back pain", "favorite_color": "blue"}, "new_quotes": []}',
+            "anthropic"
+        ))
+        
+        engine = CaptureEngine(sample_capture_schema, llm_router=mock_llm_router)
+        
+        result = await engine.extract("test", {})
+        
+        assert result["slots"] == {"pain": "back pain"}
+    
     async def test_new_quotes_extracted(self, sample_capture_schema, mock_llm_router):
         """Test new_quotes extracted."""
         engine = CaptureEngine(sample_capture_schema, llm_router=mock_llm_router)
@@ -216,6 +256,181 @@ class TestExtraction:
         assert "my back hurts" in result["new_quotes"]
 
 
+@pytest.mark.asyncio
+class TestExtractMany:
+    """Test concurrent batch extraction."""
+    
+    async def test_extract_many_runs_concurrently(self, sample_capture_schema, mock_llm_router):
+        """Test 20 messages each hit the router and overlap in time."""
+        all_in_flight = asyncio.Event()
+        in_flight = 0
+        peak = 0
+        
+        async def overlapping_call(**kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            if in_flight == 20:
+                all_in_flight.set()
+            try:
+                # Released only once every call overlaps; a serial run times out once
+                await asyncio.wait_for(all_in_flight.wait(), timeout=1)
+            except asyncio.TimeoutError:
+                all_in_flight.set()
+            in_flight -= 1
+            return '{"slots": {"pain": "back pain"}, "new_quotes": []}', "anthropic"
+        
+        mock_llm_router.call = AsyncMock(side_effect=overlapping_call)
+        engine = CaptureEngine(sample_capture_schema, llm_router=mock_llm_router, max_concurrency=20)
+        
+        results = await engine.extract_many([(f"message {i}", {}) for i in range(20)])
+        
+        assert mock_llm_router.call.call_count == 20
+        assert len(results) == 20
+        assert all(result["slots"] == {"pain": "back pain"} for result in results)
+        assert peak == 20
+    
+    async def test_extract_many_respects_max_concurrency(self, sample_capture_schema, mock_llm_router):
+        """Test no more than max_concurrency calls are in flight."""
+        in_flight = 0
+        peak = 0
+        
+        async def tracked_call(**kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return '{"slots": {}, "new_quotes": []}', "anthropic"
+        
+        mock_llm_router.call = AsyncMock(side_effect=tracked_call)
+        engine = CaptureEngine(sample_capture_schema, llm_router=mock_llm_router, max_concurrency=3)
+        
+        await engine.extract_many([(f"message {i}", {}) for i in range(10)])
+        
+        assert peak == 3
+    
+    async def test_extract_many_preserves_order(self, sample_capture_schema, mock_llm_router):
+        """Test results line up with the input items."""
+        async def echo_call(prompt, **kwargs):
+            message = prompt.split('Message: "')[1].split('"')[0]
+            return json.dumps({"slots": {"pain": message}, "new_quotes": []}), "anthropic"
+        
+        mock_llm_router.call = AsyncMock(side_effect=echo_call)
+        engine = CaptureEngine(sample_capture_schema, llm_router=mock_llm_router)
+        
+        results = await engine.extract_many([("first", {}), ("second", {}), ("third", {})])
+        
+        assert [result["slots"]["pain"] for result in results] == ["first", "second", "third"]
+
+
+@pytest.mark.asyncio
+class TestExtractionCache:
+    """Test extraction short-circuits through ExactMatchCache."""
+    
+    async def test_extract_uses_cache_on_repeat(self, sample_capture_schema, mock_llm_router):
+        """Test a repeated message is served from cache without a second LLM call."""
+        engine = CaptureEngine(sample_capture_schema, llm_router=mock_llm_router, cache=ExactMatchCache())
+        
+        first = await engine.extract("My back hurts", {})
+        second = await engine.extract("My back hurts", {})
+        
+        assert mock_llm_router.call.call_count == 1
+        assert second == first
+    
+    async def test_extract_bypasses_cache_on_miss(self, sample_capture_schema, mock_llm_router):
+        """Test distinct messages each reach the LLM."""
+        engine = CaptureEngine(sample_capture_schema, llm_router=mock_llm_router, cache=ExactMatchCache())
+        
+        await engine.extract("My back hurts", {})
+        await engine.extract("My neck hurts", {})
+        
+        assert mock_llm_router.call.call_count == 2
+    
+    async def test_extract_cache_case_sensitive(self, sample_capture_schema, mock_llm_router):
+        """Test messages differing only in case do not share verbatim quotes."""
+        engine = CaptureEngine(sample_capture_schema, llm_router=mock_llm_router, cache=ExactMatchCache())
+        
+        await engine.extract("My back hurts", {})
+        await engine.extract("MY BACK HURTS", {})
+        
+        assert mock_llm_router.call.call_count == 2
+    
+    async def test_mutating_result_leaves_cache_intact(self, sample_capture_schema, mock_llm_router):
+        """Test callers mutating a returned result cannot corrupt the cached entry."""
+        engine = CaptureEngine(sample_capture_schema, llm_router=mock_llm_router, cache=ExactMatchCache())
+        
+        first = await engine.extract("My back hurts", {})
+        first["slots"]["pain"] = "changed"
+        first["new_quotes"].append("injected")
+        second = await engine.extract("My back hurts", {})
+        second["slots"].clear()
+        third = await engine.extract("My back hurts", {})
+        
+        assert third == {"slots": {"pain": "back pain"}, "new_quotes": ["my back hurts"]}
+    
+    async def test_direct_client_caches_slots_and_quotes_only(self, sample_capture_schema, mock_llm_pool):
+        """Test the direct-client path caches the same shape as the router path."""
+        mock_llm_pool.get_anthropic_client.return_value.messages.create = AsyncMock(return_value=MagicMock(
+            content=[MagicMock(text='{"slots": {"pain": "back pain"}, "new_quotes": [], "extra": 1}')]
+        ))
+        engine = CaptureEngine(sample_capture_schema, llm_pool=mock_llm_pool, cache=ExactMatchCache())
+        
+        await engine.extract("My back hurts", {})
+        cached = await engine.extract("My back hurts", {})
+        
+        assert cached == {"slots": {"pain": "back pain"}, "new_quotes": []}
+    
+    async def test_fallback_result_not_cached(self, sample_capture_schema, mock_llm_router):
+        """Test an unparseable reply is not cached."""
+        mock_llm_router.call = AsyncMock(return_value=("invalid json", "anthropic"))
+        cache = ExactMatchCache()
+        engine = CaptureEngine(sample_capture_schema, llm_router=mock_llm_router, cache=cache)
+        
+        await engine.extract("test message", {})
+        
+        assert cache.get_stats()["size"] == 0
+
+
+@pytest.mark.asyncio
+class TestListenForPrescreen:
+    """Test the opt-in listen_for keyword prescreen."""
+    
+    async def test_prescreen_skips_llm_without_keywords(self, sample_capture_schema, mock_llm_router):
+        """Test a message with no listen_for phrase never reaches the router."""
+        engine = CaptureEngine(sample_capture_schema, llm_router=mock_llm_router, prescreen=True)
+        
+        result = await engine.extract("hello world", {})
+        
+        assert result == {"slots": {}, "new_quotes": []}
+        mock_llm_router.call.assert_not_called()
+    
+    async def test_prescreen_passes_matching_message(self, sample_capture_schema, mock_llm_router):
+        """Test a message containing a listen_for phrase is extracted."""
+        engine = CaptureEngine(sample_capture_schema, llm_router=mock_llm_router, prescreen=True)
+        
+        result = await engine.extract("My back HURTS", {})
+        
+        assert result["slots"]["pain"] == "back pain"
+        mock_llm_router.call.assert_called_once()
+    
+    async def test_prescreen_matches_whole_words(self, sample_capture_schema, mock_llm_router):
+        """Test keywords inside longer words do not count as matches."""
+        engine = CaptureEngine(sample_capture_schema, llm_router=mock_llm_router, prescreen=True)
+        
+        await engine.extract("painting the butler's room", {})
+        
+        mock_llm_router.call.assert_not_called()
+    
+    async def test_prescreen_off_by_default(self, sample_capture_schema, mock_llm_router):
+        """Test engines call the LLM for every message unless prescreen is enabled."""
+        engine = CaptureEngine(sample_capture_schema, llm_router=mock_llm_router)
+        
+        await engine.extract("hello world", {})
+        
+        mock_llm_router.call.assert_called_once()
+
+
 @pytest.mark.asyncio
 class TestFallbackBehavior:
     """Test fallback behavior."""
@@ -245,6 +460,46 @@ class TestFallbackBehavior:
         assert result["slots"] == {}
         assert result["new_quotes"] == []
     
+    async def test_retry_is_non_blocking(self, sample_capture_schema, mock_llm_router):
+        """Test concurrent extractions back off in parallel, not one after another."""
+        attempts = {}
+        
+        async def flaky_call(prompt, **kwargs):
+            attempts[prompt] = attempts.get(prompt, 0) + 1
+            if attempts[prompt] == 1:
+                raise Exception("transient")
+            return '{"slots": {"pain": "back pain"}, "new_quotes": []}', "anthropic"
+        
+        both_backing_off = asyncio.Event()
+        sleeping = 0
+        peak = 0
+        
+        async def tracked_sleep(delay):
+            nonlocal sleeping, peak
+            sleeping += 1
+            peak = max(peak, sleeping)
+            if sleeping == 2:
+                both_backing_off.set()
+            try:
+                # Released only once both backoffs overlap; serialized retries time out once
+                await asyncio.wait_for(both_backing_off.wait(), timeout=1)
+            except asyncio.TimeoutError:
+                both_backing_off.set()
+            sleeping -= 1
+        
+        mock_llm_router.call = AsyncMock(side_effect=flaky_call)
+        engine = CaptureEngine(sample_capture_schema, llm_router=mock_llm_router)
+        
+        with patch('asyncio.sleep', new=tracked_sleep):
+            results = await asyncio.gather(
+                engine.extract("My back hurts", {}),
+                engine.extract("My neck hurts", {})
+            )
+        
+        assert all(result["slots"] == {"pain": "back pain"} for result in results)
+        assert mock_llm_router.call.call_count == 4
+        assert peak == 2
+    
     async def test_fallback_when_api_error(self, sample_capture_schema, mock_anthropic_client):
         """Test fallback when API error occurs."""
         from anthropic import APIError
@@ -291,37 +546,3 @@ class TestPromptCompression:
         # Prompt should be relatively compact
         # (exact token count depends on tokenizer, but should be concise)
         assert len(prompt) < 1000  # Character count heuristic
-
-
-class TestSlotFormatting:
-    """Test slot formatting."""
-    
-    def test_format_slots_structure(self, sample_capture_schema):
-        """Test formatted string structure."""
-        engine = CaptureEngine(sample_capture_schema)
-        formatted = engine._format_slots()
-        
-        assert "- pain:" in formatted
-        assert "Customer's pain point" in formatted
-        assert "Listen for:" in formatted
-    
-    def test_format_slots_truncates_listen_for(self, sample_capture_schema):
-        """Test listen_for truncated to 5 items."""
-        # Create schema with more than 5 listen_for items
-        large_schema = {
-            "capture_schema": {
-                "slots": {
-                    "test_slot": {
-                        "description": "Test",
-                        "listen_for": ["1", "2", "3", "4", "5", "6", "7", "8"]
-                    }
-                }
-            }
-        }
-        
-        engine = CaptureEngine(large_schema)
-        formatted = engine._format_slots()
-        
-        # Should only show first 5 items
-        assert "1, 2, 3, 4, 5" in formatted or formatted.count("Listen for") == 1
-
@@ -4,8 +4,7 @@ Unit tests for ExactMatchCache.
 Tests cache hit/miss, expiration, eviction, and stats functionality.
 """
 import pytest
-import time
-from unittest.mock import patch
+import threading
 from sales_agent.engine.exact_cache import ExactMatchCache
 
 
@@ -15,12 +14,6 @@ def cache():
     return ExactMatchCache(ttl_seconds=60, max_size=100)
 
 
-@pytest.fixture
-def cache_short_ttl():
-    """Create a cache instance with short TTL for expiration testing."""
-    return ExactMatchCache(ttl_seconds=1, max_size=100)
-
-
 class TestExactCacheInitialization:
     """Test cache initialization."""
     
@@ -86,6 +79,12 @@ class TestExactCacheKeyGeneration:
         key2 = cache._make_key("test message", {})
         assert key1 == key2
     
+    def test_internal_whitespace_collapsed(self, cache):
+        """Test internal whitespace runs, tabs and newlines collapse."""
+        key1 = cache._make_key("test \t message\n", {})
+        key2 = cache._make_key("test message", {})
+        assert key1 == key2
+    
     def test_context_filters_empty_values(self, cache):
         """Test context filters out empty values."""
         key1 = cache._make_key("test", {"a": "1", "b": None, "c": ""})
@@ -114,19 +113,19 @@ class TestExactCacheGet:
         assert stats["hits"] == 1
         assert stats["misses"] == 0
     
-    @patch('time.time')
-    def test_cache_expiration(self, mock_time, cache_short_ttl):
+    def test_cache_expiration(self):
         """Test cache expires entries after TTL."""
         # Set initial time
-        mock_time.return_value = 0
-        cache_short_ttl.set("test message", {}, {"response": "test"})
+        now = [0.0]
+        cache = ExactMatchCache(ttl_seconds=1, clock=lambda: now[0])
+        cache.set("test message", {}, {"response": "test"})
         
         # Fast forward time past TTL
-        mock_time.return_value = 2
+        now[0] = 2.0
         
-        result = cache_short_ttl.get("test message", {})
+        result = cache.get("test message", {})
         assert result is None
-        stats = cache_short_ttl.get_stats()
+        stats = cache.get_stats()
         assert stats["misses"] == 1
         assert stats["size"] == 0  # Expired entry removed
     
@@ -174,15 +173,15 @@ class TestExactCacheSet:
         assert result == {"response": "new"}
         assert cache.get_stats()["size"] == 1  # Still one entry
     
-    def test_timestamp_set(self, cache):
+    def test_timestamp_set(self):
         """Test timestamp is set correctly."""
-        with patch('time.time', return_value=12345.0):
-            cache.set("test message", {}, {"response": "test"})
-            
-            # Entry should have timestamp
-            cache_key = cache._make_key("test message", {})
-            assert cache_key in cache.cache
-            assert cache.cache[cache_key]["timestamp"] == 12345.0
+        cache = ExactMatchCache(clock=lambda: 12345.0)
+        cache.set("test message", {}, {"response": "test"})
+        
+        # Entry should have timestamp
+        cache_key = cache._make_key("test message", {})
+        assert cache_key in cache.cache
+        assert cache.cache[cache_key][0] == 12345.0
 
 
 class TestExactCacheEviction:
@@ -198,21 +197,76 @@ class TestExactCacheEviction:
         cache.set("message3", {}, {"r": "3"})
         assert cache.get_stats()["size"] == 3
         
-        # Add one more - should evict oldest
-        with patch('time.time', side_effect=[1.0, 2.0, 3.0, 4.0, 5.0]):
-            cache.set("message1", {}, {"r": "1"})  # timestamp = 1.0
-            cache.set("message2", {}, {"r": "2"})  # timestamp = 2.0
-            cache.set("message3", {}, {"r": "3"})  # timestamp = 3.0
-            
-            # Add new entry - should evict message1 (oldest)
-            cache.set("message4", {}, {"r": "4"})  # timestamp = 4.0
-            
-            # message1 should be evicted
-            assert cache.get("message1", {}) is None
-            assert cache.get("message2", {}) is not None
-            assert cache.get("message3", {}) is not None
-            assert cache.get("message4", {}) is not None
-            assert cache.get_stats()["size"] == 3
+        # Add new entry - should evict message1 (least recently used)
+        cache.set("message4", {}, {"r": "4"})
+        
+        # message1 should be evicted
+        assert cache.get("message1", {}) is None
+        assert cache.get("message2", {}) is not None
+        assert cache.get("message3", {}) is not None
+        assert cache.get("message4", {}) is not None
+        assert cache.get_stats()["size"] == 3
+    
+    def test_get_promotes_entry(self):
+        """Test a cache hit protects the entry from the next eviction."""
+        cache = ExactMatchCache(max_size=3)
+        
+        cache.set("message1", {}, {"r": "1"})
+        cache.set("message2", {}, {"r": "2"})
+        cache.set("message3", {}, {"r": "3"})
+        
+        # Touch message1 so message2 becomes least recently used
+        cache.get("message1", {})
+        cache.set("message4", {}, {"r": "4"})
+        
+        assert cache.get("message1", {}) == {"r": "1"}
+        assert cache.get("message2", {}) is None
+    
+    def test_full_cache_sweeps_expired_before_lru(self):
+        """Test a full cache drops expired entries before evicting live ones."""
+        now = [0.0]
+        cache = ExactMatchCache(ttl_seconds=1, max_size=3, clock=lambda: now[0])
+        
+        cache.set("message1", {}, {"r": "1"})
+        now[0] = 0.6
+        cache.set("message2", {}, {"r": "2"})
+        cache.set("message3", {}, {"r": "3"})
+        # Recently used but set at t=0, so it expires first
+        now[0] = 0.7
+        cache.get("message1", {})
+        
+        now[0] = 1.5
+        cache.set("message4", {}, {"r": "4"})
+        
+        # message2 is least recently used yet survives; expired message1 went instead
+        assert cache.get("message2", {}) == {"r": "2"}
+        assert cache.get("message1", {}) is None
+        assert cache.get_stats()["size"] == 3
+    
+    def test_sweep_skipped_within_ttl_of_last_sweep(self):
+        """Test a full cache evicts LRU without rescanning until a TTL has passed."""
+        now = [0.0]
+        cache = ExactMatchCache(ttl_seconds=1, max_size=3, clock=lambda: now[0])
+        
+        cache.set("message1", {}, {"r": "1"})
+        now[0] = 0.5
+        cache.set("message2", {}, {"r": "2"})
+        now[0] = 0.7
+        cache.set("message3", {}, {"r": "3"})
+        
+        # First full insert sweeps expired message1
+        now[0] = 1.2
+        cache.set("message4", {}, {"r": "4"})
+        # Promote message2 so the live message3 is least recently used
+        now[0] = 1.3
+        cache.get("message2", {})
+        
+        # message2 has expired, but the last sweep was under a TTL ago
+        now[0] = 1.6
+        cache.set("message5", {}, {"r": "5"})
+        
+        assert cache.get("message3", {}) is None
+        assert cache.get("message4", {}) == {"r": "4"}
     
     def test_no_eviction_when_entry_exists(self, cache):
         """Test no eviction when updating existing entry."""
@@ -285,3 +339,31 @@ class TestExactCacheStats:
         stats = cache.get_stats()
         assert stats["size"] == 2
 
+
+class TestExactCacheConcurrency:
+    """Test cache use from multiple threads."""
+    
+    def test_concurrent_get_set(self):
+        """Test threads hammering get/set raise nothing and respect max_size."""
+        cache = ExactMatchCache(max_size=50)
+        errors = []
+        
+        def worker(worker_id):
+            try:
+                for i in range(500):
+                    message = f"message{(worker_id * 7 + i) % 120}"
+                    cache.set(message, {}, {"r": str(i)})
+                    cache.get(message, {})
+            except Exception as e:
+                errors.append(e)
+        
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert errors == []
+        stats = cache.get_stats()
+        assert stats["size"] <= 50
+        assert stats["hits"] + stats["misses"] == 8 * 500
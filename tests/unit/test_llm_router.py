@@ -6,9 +6,22 @@ Tests multi-provider racing, tiered model selection, fallback logic, and statist
 import pytest
 import asyncio
 from unittest.mock import AsyncMock, MagicMock, patch
+from sales_agent.config.settings import config
 from sales_agent.engine.llm_router import LLMRouter
 
 
+@pytest.fixture
+def openai_api_key():
+    """Enable OpenAI racing for a test.
+    
+    config reads OPENAI_API_KEY once at import, so the attribute is what the
+    router sees; patching os.environ per test never reached it.
+    """
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(config, "OPENAI_API_KEY", "test-key")
+        yield
+
+
 @pytest.fixture
 def mock_anthropic_client():
     """Mock Anthropic client."""
@@ -154,68 +167,69 @@ class TestSingleProviderCall:
 
 
 @pytest.mark.asyncio
+@pytest.mark.usefixtures("openai_api_key")
 class TestMultiProviderRacing:
     """Test multi-provider racing."""
     
     async def test_racing_with_two_providers(self, mock_llm_pool, mock_anthropic_client, mock_openai_client):
         """Test racing with 2 providers (mock both)."""
-        # Make Anthropic faster
+        # Make Anthropic faster; OpenAI blocks until the router cancels it
+        never_set = asyncio.Event()
+        
         async def fast_anthropic(*args, **kwargs):
-            await asyncio.sleep(0.01)
             return MagicMock(content=[MagicMock(text="Anthropic won")])
         
         async def slow_openai(*args, **kwargs):
-            await asyncio.sleep(0.1)
+            await asyncio.wait_for(never_set.wait(), timeout=1)
             return MagicMock(choices=[MagicMock(message=MagicMock(content="OpenAI won"))])
         
         mock_anthropic_client.messages.create = AsyncMock(side_effect=fast_anthropic)
         mock_openai_client.chat.completions.create = AsyncMock(side_effect=slow_openai)
         
-        with patch.dict('os.environ', {'OPENAI_API_KEY': 'test-key'}):
-            with patch('sales_agent.engine.llm_router.AsyncOpenAI', return_value=mock_openai_client):
-                router = LLMRouter(llm_pool=mock_llm_pool, enable_openai=True)
-                
-                response_text, provider = await router.call("test prompt", max_tokens=100)
-                
-                assert provider == "anthropic"
-                assert response_text == "Anthropic won"
-                assert router.stats["anthropic"]["wins"] == 1
+        with patch('sales_agent.engine.llm_router.AsyncOpenAI', return_value=mock_openai_client):
+            router = LLMRouter(llm_pool=mock_llm_pool, enable_openai=True)
+            
+            response_text, provider = await router.call("test prompt", max_tokens=100)
+            
+            assert provider == "anthropic"
+            assert response_text == "Anthropic won"
+            assert router.stats["anthropic"]["wins"] == 1
     
     async def test_first_completed_wins(self, mock_llm_pool, mock_anthropic_client, mock_openai_client):
         """Test first completed provider wins."""
-        # Make OpenAI faster this time
+        # Make OpenAI faster this time; Anthropic blocks until cancelled
+        never_set = asyncio.Event()
+        
         async def slow_anthropic(*args, **kwargs):
-            await asyncio.sleep(0.1)
+            await asyncio.wait_for(never_set.wait(), timeout=1)
             return MagicMock(content=[MagicMock(text="Anthropic")])
         
         async def fast_openai(*args, **kwargs):
-            await asyncio.sleep(0.01)
             return MagicMock(choices=[MagicMock(message=MagicMock(content="OpenAI won"))])
         
         mock_anthropic_client.messages.create = AsyncMock(side_effect=slow_anthropic)
         mock_openai_client.chat.completions.create = AsyncMock(side_effect=fast_openai)
         
-        with patch.dict('os.environ', {'OPENAI_API_KEY': 'test-key'}):
-            with patch('sales_agent.engine.llm_router.AsyncOpenAI', return_value=mock_openai_client):
-                router = LLMRouter(llm_pool=mock_llm_pool, enable_openai=True)
-                
-                response_text, provider = await router.call("test prompt", max_tokens=100)
-                
-                assert provider == "openai"
-                assert response_text == "OpenAI won"
-                assert router.stats["openai"]["wins"] == 1
+        with patch('sales_agent.engine.llm_router.AsyncOpenAI', return_value=mock_openai_client):
+            router = LLMRouter(llm_pool=mock_llm_pool, enable_openai=True)
+            
+            response_text, provider = await router.call("test prompt", max_tokens=100)
+            
+            assert provider == "openai"
+            assert response_text == "OpenAI won"
+            assert router.stats["openai"]["wins"] == 1
     
     async def test_losing_tasks_cancelled(self, mock_llm_pool, mock_anthropic_client, mock_openai_client):
         """Test losing tasks are cancelled."""
         cancelled_tasks = []
+        never_set = asyncio.Event()
         
         async def fast_anthropic(*args, **kwargs):
-            await asyncio.sleep(0.01)
             return MagicMock(content=[MagicMock(text="Anthropic won")])
         
         async def slow_openai(*args, **kwargs):
             try:
-                await asyncio.sleep(0.1)
+                await asyncio.wait_for(never_set.wait(), timeout=1)
             except asyncio.CancelledError:
                 cancelled_tasks.append("openai")
                 raise
@@ -224,46 +238,48 @@ class TestMultiProviderRacing:
         mock_anthropic_client.messages.create = AsyncMock(side_effect=fast_anthropic)
         mock_openai_client.chat.completions.create = AsyncMock(side_effect=slow_openai)
         
-        with patch.dict('os.environ', {'OPENAI_API_KEY': 'test-key'}):
-            with patch('sales_agent.engine.llm_router.AsyncOpenAI', return_value=mock_openai_client):
-                router = LLMRouter(llm_pool=mock_llm_pool, enable_openai=True)
-                
-                await router.call("test prompt", max_tokens=100)
-                
-                # OpenAI task should have been cancelled
-                # Note: Cancellation timing may vary, but the logic should handle it
-                assert router.stats["anthropic"]["wins"] == 1
+        with patch('sales_agent.engine.llm_router.AsyncOpenAI', return_value=mock_openai_client):
+            router = LLMRouter(llm_pool=mock_llm_pool, enable_openai=True)
+            
+            await router.call("test prompt", max_tokens=100)
+            
+            # OpenAI can only finish by being cancelled
+            assert cancelled_tasks == ["openai"]
+            assert router.stats["anthropic"]["wins"] == 1
 
 
 @pytest.mark.asyncio
+@pytest.mark.usefixtures("openai_api_key")
 class TestFallbackLogic:
     """Test fallback logic when winner fails."""
     
     async def test_fallback_when_winner_fails(self, mock_llm_pool, mock_anthropic_client, mock_openai_client):
         """Test fallback when winner fails."""
-        # Anthropic fails, OpenAI succeeds
+        # Anthropic fails, OpenAI succeeds only after the router has seen that failure
         async def failing_anthropic(*args, **kwargs):
-            await asyncio.sleep(0.01)
             raise Exception("Anthropic failed")
         
+        async def anthropic_failure_seen():
+            while router.stats["anthropic"]["errors"] == 0:
+                await asyncio.sleep(0)
+        
         async def slow_openai(*args, **kwargs):
-            await asyncio.sleep(0.1)
+            await asyncio.wait_for(anthropic_failure_seen(), timeout=1)
             return MagicMock(choices=[MagicMock(message=MagicMock(content="OpenAI fallback"))])
         
         mock_anthropic_client.messages.create = AsyncMock(side_effect=failing_anthropic)
         mock_openai_client.chat.completions.create = AsyncMock(side_effect=slow_openai)
         
-        with patch.dict('os.environ', {'OPENAI_API_KEY': 'test-key'}):
-            with patch('sales_agent.engine.llm_router.AsyncOpenAI', return_value=mock_openai_client):
-                router = LLMRouter(llm_pool=mock_llm_pool, enable_openai=True)
-                
-                response_text, provider = await router.call("test prompt", max_tokens=100)
-                
-                # Should fallback to OpenAI
-                assert provider == "openai"
-                assert response_text == "OpenAI fallback"
-                assert router.stats["anthropic"]["errors"] == 1
-                assert router.stats["openai"]["wins"] == 1
+        with patch('sales_agent.engine.llm_router.AsyncOpenAI', return_value=mock_openai_client):
+            router = LLMRouter(llm_pool=mock_llm_pool, enable_openai=True)
+            
+            response_text, provider = await router.call("test prompt", max_tokens=100)
+            
+            # Should fallback to OpenAI
+            assert provider == "openai"
+            assert response_text == "OpenAI fallback"
+            assert router.stats["anthropic"]["errors"] == 1
+            assert router.stats["openai"]["wins"] == 1
     
     async def test_all_providers_fail(self, mock_llm_pool, mock_anthropic_client, mock_openai_client):
         """Test all providers fail (raises exception)."""
@@ -6,9 +6,18 @@ Tests situation detection logic, fallback handling, prompt compression, and LLM
 import pytest
 import json
 from unittest.mock import AsyncMock, MagicMock, patch
+from sales_agent.engine import situation_detector
 from sales_agent.engine.situation_detector import SituationDetector
 
 
+@pytest.fixture(autouse=True)
+def reset_shared_clients():
+    """Reset the shared clients so patched constructors take effect."""
+    situation_detector.reset_shared_clients()
+    yield
+    situation_detector.reset_shared_clients()
+
+
 @pytest.fixture
 def sample_situations():
     """Sample situations for testing."""
@@ -39,6 +48,28 @@ def mock_llm_router():
     return router
 
 
+class FakeMessageStream:
+    """Async context manager mimicking the Anthropic message stream."""
+    
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.consumed = 0
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        return False
+    
+    @property
+    def text_stream(self):
+        async def _gen():
+            for chunk in self.chunks:
+                self.consumed += 1
+                yield chunk
+        return _gen()
+
+
 @pytest.fixture
 def mock_anthropic_client():
     """Mock Anthropic client."""
@@ -47,6 +78,10 @@ def mock_anthropic_client():
     client.messages.create = AsyncMock(return_value=MagicMock(
         content=[MagicMock(text='{"situation": "price_shock_in_store", "confidence": 0.9, "stage": "objection_handling"}')]
     ))
+    client.messages.stream = MagicMock(side_effect=lambda **kwargs: FakeMessageStream([
+        '{"situation": "price_shock_in_store", ',
+        '"confidence": 0.9, "stage": "objection_handling"}'
+    ]))
     return client
 
 
@@ -95,6 +130,29 @@ class TestSituationDetectorInitialization:
             with patch('sales_agent.engine.situation_detector.AsyncAnthropic', return_value=mock_anthropic_client):
                 detector = SituationDetector(sample_situations)
                 assert detector.client == mock_anthropic_client
+    
+    async def test_direct_client_shared_across_instances(self, sample_situations, mock_anthropic_client):
+        """Test detectors without pool/router share one client."""
+        with patch('sales_agent.engine.situation_detector.AsyncAnthropic', return_value=mock_anthropic_client) as mock_cls:
+            first = SituationDetector(sample_situations)
+            second = SituationDetector(sample_situations)
+            
+            assert first.client is second.client
+            mock_cls.assert_called_once()
+    
+    async def test_direct_client_not_shared_across_loops(self, sample_situations):
+        """Test a detector on another event loop gets its own client."""
+        import asyncio
+        
+        async def build():
+            return SituationDetector(sample_situations).client
+        
+        with patch('sales_agent.engine.situation_detector.AsyncAnthropic', side_effect=lambda **kwargs: MagicMock()):
+            here = await build()
+            other = await asyncio.to_thread(asyncio.run, build())
+            
+            assert here is await build()
+            assert other is not here
 
 
 @pytest.mark.asyncio
@@ -245,6 +303,21 @@ class TestFallbackBehavior:
         assert result["situation"] == "just_browsing"
         assert result["confidence"] == 0.3
     
+    async def test_json_with_surrounding_prose_recovered(self, sample_situations, mock_llm_router):
+        """Test JSON object is extracted when the model adds prose around it."""
+        mock_llm_router.call = AsyncMock(return_value=(
+            'Here\'s the JSON: {"situation": "price_shock_in_store", "confidence": 0.8, '
+            '"stage": "objection_handling"} Note: other keys like {situation} were ignored.',
+            "anthropic"
+        ))
+        
+        detector = SituationDetector(sample_situations, llm_router=mock_llm_router)
+        
+        result = await detector.detect("test message", {})
+        
+        assert result["situation"] == "price_shock_in_store"
+        assert result["confidence"] == 0.8
+    
     async def test_fallback_when_api_error(self, sample_situations, mock_anthropic_client):
         """Test fallback when API error occurs."""
         from anthropic import APIError
@@ -263,6 +336,162 @@ class TestFallbackBehavior:
                     assert result["confidence"] == 0.3
 
 
+@pytest.mark.asyncio
+class TestStreaming:
+    """Test streamed detection on the direct client path."""
+    
+    async def test_stream_stops_after_object_closes(self, sample_situations, mock_llm_pool, mock_anthropic_client):
+        """Test trailing chunks are not consumed once the JSON object closes."""
+        stream = FakeMessageStream([
+            '{"situation": "price_shock_in_store", "confidence": 0.9, ',
+            '"stage": "objection_handling"}',
+            ' Let me know if you need anything else.',
+            ' More trailing prose.'
+        ])
+        mock_anthropic_client.messages.stream = MagicMock(return_value=stream)
+        detector = SituationDetector(sample_situations, llm_pool=mock_llm_pool)
+        
+        result = await detector.detect("This is too expensive", {})
+        
+        assert result["situation"] == "price_shock_in_store"
+        assert stream.consumed == 2
+    
+    async def test_stream_handles_prose_before_object(self, sample_situations, mock_llm_pool, mock_anthropic_client):
+        """Test leading prose is tolerated before the JSON object."""
+        mock_anthropic_client.messages.stream = MagicMock(return_value=FakeMessageStream([
+            "Here is the result: ",
+            '{"situation": "just_browsing", "confidence": 0.6, "stage": "discovery"}'
+        ]))
+        detector = SituationDetector(sample_situations, llm_pool=mock_llm_pool)
+        
+        result = await detector.detect("Just looking", {})
+        
+        assert result["situation"] == "just_browsing"
+    
+    async def test_stream_ignores_stray_brace_before_object(self, sample_situations, mock_llm_pool, mock_anthropic_client):
+        """Test a closing brace in leading prose does not cut the object short."""
+        stream = FakeMessageStream([
+            "Sure :} here you go ",
+            '{"situation": "just_browsing", ',
+            '"confidence": 0.6, "stage": "discovery"}',
+            " Trailing prose."
+        ])
+        mock_anthropic_client.messages.stream = MagicMock(return_value=stream)
+        detector = SituationDetector(sample_situations, llm_pool=mock_llm_pool)
+        
+        result = await detector.detect("Just looking", {})
+        
+        assert result["situation"] == "just_browsing"
+        assert result["confidence"] == 0.6
+        assert stream.consumed == 3
+    
+    async def test_stream_ignores_braces_inside_strings(self, sample_situations, mock_llm_pool, mock_anthropic_client):
+        """Test braces inside JSON string values do not close the object."""
+        stream = FakeMessageStream([
+            '{"situation": "just_browsing", "note": "says \\"}\\" now", ',
+            '"confidence": 0.6, "stage": "discovery"}',
+            " Trailing prose."
+        ])
+        mock_anthropic_client.messages.stream = MagicMock(return_value=stream)
+        detector = SituationDetector(sample_situations, llm_pool=mock_llm_pool)
+        
+        result = await detector.detect("Just looking", {})
+        
+        assert result["stage"] == "discovery"
+        assert result["note"] == 'says "}" now'
+        assert stream.consumed == 2
+
+
+@pytest.mark.asyncio
+class TestHedging:
+    """Test hedged requests on the direct client path."""
+    
+    async def test_no_hedge_when_primary_fast(self, sample_situations, mock_llm_pool):
+        """Test a request finishing within the hedge delay is sent only once."""
+        detector = SituationDetector(sample_situations, llm_pool=mock_llm_pool)
+        func = AsyncMock(return_value="primary")
+        
+        result = await detector._hedged_call(func, delay=10.0)
+        
+        assert result == "primary"
+        assert func.call_count == 1
+    
+    async def test_hedged_call_returns_fastest(self, sample_situations, mock_llm_pool):
+        """Test a slow primary is hedged and the faster copy wins."""
+        import asyncio
+        
+        detector = SituationDetector(sample_situations, llm_pool=mock_llm_pool)
+        never_set = asyncio.Event()
+        primary_cancelled = asyncio.Event()
+        calls = []
+        
+        async def func():
+            calls.append(1)
+            if len(calls) == 1:
+                try:
+                    await asyncio.wait_for(never_set.wait(), timeout=1)
+                except asyncio.CancelledError:
+                    primary_cancelled.set()
+                    raise
+                return "primary"
+            return "hedge"
+        
+        result = await detector._hedged_call(func, delay=0)
+        
+        assert result == "hedge"
+        assert len(calls) == 2
+        # The losing request is cancelled once the hedge wins
+        await asyncio.wait_for(primary_cancelled.wait(), timeout=1)
+    
+    async def test_hedged_call_survives_one_failure(self, sample_situations, mock_llm_pool):
+        """Test a failed primary is hedged immediately rather than after the delay."""
+        detector = SituationDetector(sample_situations, llm_pool=mock_llm_pool)
+        func = AsyncMock(side_effect=[Exception("fast failure"), "hedge success"])
+        
+        result = await detector._hedged_call(func, delay=10.0)
+        
+        assert result == "hedge success"
+        assert func.call_count == 2
+    
+    async def test_hedged_call_all_fail(self, sample_situations, mock_llm_pool):
+        """Test hedged call raises when every request fails."""
+        detector = SituationDetector(sample_situations, llm_pool=mock_llm_pool)
+        
+        async def func():
+            raise ValueError("boom")
+        
+        with pytest.raises(ValueError):
+            await detector._hedged_call(func)
+    
+    async def test_hedged_call_skips_cancelled_copy(self, sample_situations, mock_llm_pool):
+        """Test a copy cancelled out from under the hedge does not raise CancelledError."""
+        import asyncio
+        
+        detector = SituationDetector(sample_situations, llm_pool=mock_llm_pool)
+        calls = []
+        
+        async def func():
+            calls.append(1)
+            if len(calls) == 1:
+                asyncio.current_task().cancel()
+                await asyncio.sleep(0)
+            return "hedge"
+        
+        result = await detector._hedged_call(func, delay=10.0)
+        
+        assert result == "hedge"
+    
+    async def test_detect_sends_single_request_when_fast(self, sample_situations, mock_llm_pool, mock_anthropic_client):
+        """Test hedging adds no request when the stream finishes within the delay."""
+        with patch('sales_agent.engine.situation_detector.config.ENABLE_HEDGING', True):
+            detector = SituationDetector(sample_situations, llm_pool=mock_llm_pool)
+            
+            result = await detector.detect("This is too expensive", {})
+        
+        assert result["situation"] == "price_shock_in_store"
+        assert mock_anthropic_client.messages.stream.call_count == 1
+
+
 @pytest.mark.asyncio
 class TestPromptCompression:
     """Test prompt compression."""
@@ -291,31 +520,3 @@ class TestPromptCompression:
         
         # Prompt should be relatively compact
         assert len(prompt) < 800  # Character count heuristic
-
-
-class TestSituationFormatting:
-    """Test situation formatting."""
-    
-    def test_format_situations_structure(self, sample_situations):
-        """Test formatted string structure."""
-        detector = SituationDetector(sample_situations)
-        formatted = detector._format_situations()
-        
-        assert "- price_shock_in_store:" in formatted
-        assert "signals=" in formatted or "signals=[" in formatted
-    
-    def test_format_situations_truncates_signals(self, sample_situations):
-        """Test signals truncated to 3 items."""
-        # Create situations with more than 3 signals
-        large_situations = {
-            "test_situation": {
-                "signals": ["signal1", "signal2", "signal3", "signal4", "signal5", "signal6"]
-            }
-        }
-        
-        detector = SituationDetector(large_situations)
-        formatted = detector._format_situations()
-        
-        # Should only show first 3 signals
-        assert "signal1" in formatted or formatted.count("signals=") == 1
-
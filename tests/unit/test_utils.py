@@ -5,8 +5,8 @@ Tests retry logic with exponential backoff.
 """
 import pytest
 import asyncio
-from unittest.mock import AsyncMock, patch
-from sales_agent.engine.utils import retry_with_backoff
+from unittest.mock import AsyncMock, MagicMock, patch
+from sales_agent.engine.utils import retry_with_backoff, retry_after_hint
 
 
 @pytest.mark.asyncio
@@ -160,4 +160,171 @@ class TestRetryWithBackoff:
         
         # Should raise the last exception
         assert exc_info.value == exception3
+    
+    async def test_delay_hint_extends_backoff(self):
+        """Test provider delay hint is used when larger than backoff."""
+        func = AsyncMock(side_effect=[Exception("rate limited"), "success"])
+        
+        with patch('asyncio.sleep') as mock_sleep:
+            await retry_with_backoff(
+                func,
+                max_attempts=3,
+                base_delay=1.0,
+                max_delay=10.0,
+                delay_hint=lambda e: 5.0
+            )
+            
+            mock_sleep.assert_called_once_with(5.0)
+    
+    async def test_delay_hint_smaller_than_backoff_ignored(self):
+        """Test backoff delay wins when hint is smaller."""
+        func = AsyncMock(side_effect=[Exception("fail"), "success"])
+        
+        with patch('asyncio.sleep') as mock_sleep:
+            await retry_with_backoff(
+                func,
+                max_attempts=3,
+                base_delay=2.0,
+                max_delay=10.0,
+                delay_hint=lambda e: 0.5
+            )
+            
+            mock_sleep.assert_called_once_with(2.0)
+    
+    async def test_delay_hint_larger_than_max_delay_honoured(self):
+        """Test a hint above max_delay is waited out in full."""
+        func = AsyncMock(side_effect=[Exception("rate limited"), "success"])
+        
+        with patch('asyncio.sleep') as mock_sleep:
+            await retry_with_backoff(
+                func,
+                max_attempts=3,
+                base_delay=1.0,
+                max_delay=10.0,
+                delay_hint=lambda e: 30.0,
+                max_hint_delay=60.0
+            )
+            
+            mock_sleep.assert_called_once_with(30.0)
+    
+    async def test_delay_hint_beyond_ceiling_gives_up(self):
+        """Test a hint longer than max_hint_delay raises without retrying."""
+        func = AsyncMock(side_effect=[Exception("rate limited"), "success"])
+        
+        with patch('asyncio.sleep') as mock_sleep:
+            with pytest.raises(Exception, match="rate limited"):
+                await retry_with_backoff(
+                    func,
+                    max_attempts=3,
+                    base_delay=1.0,
+                    max_delay=10.0,
+                    delay_hint=lambda e: 3600.0,
+                    max_hint_delay=60.0
+                )
+            
+            mock_sleep.assert_not_called()
+        assert func.call_count == 1
+    
+    async def test_full_jitter_delay(self):
+        """Test jitter sleeps a uniform random time up to the backoff delay."""
+        func = AsyncMock(side_effect=[Exception("fail"), "success"])
+        
+        with patch('sales_agent.engine.utils.random.uniform', return_value=0.4) as mock_uniform:
+            with patch('asyncio.sleep') as mock_sleep:
+                await retry_with_backoff(func, max_attempts=3, base_delay=1.0, max_delay=10.0, jitter=True)
+                
+                mock_uniform.assert_called_once_with(0, 1.0)
+                mock_sleep.assert_called_once_with(0.4)
+    
+    async def test_attempt_timeout_triggers_retry(self):
+        """Test a stalled attempt times out and is retried."""
+        calls = []
+        
+        async def func():
+            calls.append(1)
+            if len(calls) == 1:
+                await asyncio.sleep(1.0)
+            return "success"
+        
+        result = await retry_with_backoff(
+            func,
+            max_attempts=2,
+            base_delay=0.01,
+            attempt_timeout=0.05
+        )
+        
+        assert result == "success"
+        assert len(calls) == 2
+    
+    async def test_attempt_timeout_retried_outside_exceptions(self):
+        """Test a timed-out attempt is retried even if exceptions omits TimeoutError."""
+        calls = []
+        
+        async def func():
+            calls.append(1)
+            if len(calls) == 1:
+                await asyncio.sleep(1.0)
+            return "success"
+        
+        result = await retry_with_backoff(
+            func,
+            max_attempts=2,
+            base_delay=0.01,
+            exceptions=(ValueError,),
+            attempt_timeout=0.05
+        )
+        
+        assert result == "success"
+        assert len(calls) == 2
+    
+    async def test_no_attempt_timeout_by_default(self):
+        """Test attempts are not wrapped in wait_for unless a timeout is given."""
+        func = AsyncMock(return_value="success")
+        
+        with patch('sales_agent.engine.utils.asyncio.wait_for') as mock_wait_for:
+            result = await retry_with_backoff(func, max_attempts=1)
+        
+        assert result == "success"
+        mock_wait_for.assert_not_called()
+    
+    async def test_attempt_timeout_exhausts_attempts(self):
+        """Test TimeoutError raised when every attempt stalls."""
+        async def func():
+            await asyncio.sleep(1.0)
+        
+        with pytest.raises(asyncio.TimeoutError):
+            await retry_with_backoff(
+                func,
+                max_attempts=2,
+                base_delay=0.01,
+                attempt_timeout=0.05
+            )
+
 
+class TestRetryAfterHint:
+    """Test Retry-After header extraction."""
+    
+    def test_numeric_retry_after(self):
+        """Test numeric Retry-After header is parsed."""
+        exc = Exception("rate limited")
+        exc.response = MagicMock(headers={"retry-after": "7"})
+        
+        assert retry_after_hint(exc) == 7.0
+    
+    def test_missing_header(self):
+        """Test missing header returns None."""
+        exc = Exception("rate limited")
+        exc.response = MagicMock(headers={})
+        
+        assert retry_after_hint(exc) is None
+    
+    def test_http_date_ignored(self):
+        """Test HTTP-date Retry-After returns None."""
+        exc = Exception("rate limited")
+        exc.response = MagicMock(headers={"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"})
+        
+        assert retry_after_hint(exc) is None
+    
+    def test_exception_without_response(self):
+        """Test plain exceptions return None."""
+        assert retry_after_hint(Exception("boom")) is None